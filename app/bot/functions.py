@@ -1,4 +1,3 @@
-import json
 import asyncio
 from datetime import datetime, UTC
 
@@ -8,13 +7,20 @@ from aiogram.fsm.context import FSMContext
 from aiogram.utils.deep_linking import create_start_link
 
 import pytz
-from bs4 import BeautifulSoup
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from bot import bot, keyboards
+from bot import bot, keyboards, redis_client
 from bot.states import CreateStatement
 from config import settings
-from services.utils import translator, AsyncHTTPClient
+from services.utils import translator, AsyncHTTPClient, request_key
+from services.rate_limiter import Priority
+from services.cache import RedisCache, LRUCache, TieredCache
+from services.parsing import parse_car_detail, parsing_executor
+from services.records import SearchCar, CarDetail
+from services.circuit_breaker import circuit_breakers
+from services.displacement import DisplacementIndex
+from services.tariffs import tariffs
+from services.rates import rates
 from database.repository.user import UserRepository
 from database.repository.brand import BrandRepository
 from database.repository.model import ModelRepository
@@ -23,9 +29,24 @@ from database.repository.modification import ModificationRepository
 from database.repository.configuration import ConfigurationRepository
 from database.repository.tracking import TrackingRepository
 
+# Результаты поиска по популярным конфигурациям одинаковы для всех пользователей в пределах TTL
+search_cache = RedisCache(redis_client, 'cache:search:v2', settings.SEARCH_CACHE_TTL, settings.SEARCH_CACHE_STALE_SECONDS)
+
+# Разобранная страница автомобиля: одно объявление скачивается не чаще раза за TTL на все процессы
+car_info_cache = TieredCache(
+    LRUCache(settings.CAR_INFO_CACHE_SIZE, settings.CAR_INFO_CACHE_TTL),
+    RedisCache(redis_client, 'cache:car_info:v2', settings.CAR_INFO_CACHE_TTL)
+)
+
+displacement_index = DisplacementIndex(redis_client)
+
+# Фоновая предзагрузка карточек видимых авто по пользователю: новая страница или уход из списка отменяют прежнюю
+_prefetch_tasks: dict[int, asyncio.Task] = {}
+
 
 async def menu(message_callback: Message | CallbackQuery, state: FSMContext, session: AsyncSession):
     await state.clear()
+    cancel_prefetch(message_callback.from_user.id)
 
     first_text = (
         f'<b>Привет, {message_callback.from_user.first_name}!</b>\n'
@@ -166,22 +187,88 @@ async def get_cards(state_data: dict, page: int, session: AsyncSession) -> dict
         else:
             action = action[:-1] + ''
 
-    async with AsyncHTTPClient('https://example') as client:
-        data = await client.get(
-            endpoint='/endpoint',
-            params={
-                'param': 'example',
+    base_url = 'https://example'
+    endpoint = '/endpoint'
+    params = {
+        'count': 'true',
+        'q': action.strip(),
+        'sr': f'|ModifiedDate|{page * 20}|20'
+    }
+
+    async def fetch_cards() -> dict | None:
+        async with AsyncHTTPClient(base_url, upstream='encar') as client:
+            data = await client.get(endpoint=endpoint, params=params)
+
+        if data:
+            return {
+                'count': data['Count'],
+                'cars': [SearchCar.from_api(car).to_list() for car in data['SearchResults']]
             }
-        )
 
-    if data:
-        return {
-            'count': data['Count'],
-            'cars': data['SearchResults']
-        }
+    # Ключ строится из того же запроса, что уходит в API: разные фильтры и страницы не пересекаются
+    key = request_key(f'{base_url}{endpoint}', params)
+    return await search_cache.get_or_fetch(key, fetch_cards)
+
+
+def cancel_prefetch(user_id: int) -> None:
+    task = _prefetch_tasks.pop(user_id, None)
+    if task is not None:
+        task.cancel()
+
+
+async def prefetch_cars(car_ids: list[int], configuration_id: int) -> None:
+    """
+    Загружает в кэш страницы (и объем двигателя) показанных авто, пока пользователь выбирает.
+    Ограничена числом параллельных запросов и общим временем; запросы идут фоновой полосой лимитера
+    """
+
+    # Карточке из каталога нужен только объем двигателя: если индекс его знает, загружать нечего
+    if await displacement_index.get_confident(configuration_id) is not None:
+        return
+
+    semaphore = asyncio.Semaphore(settings.PREFETCH_CONCURRENCY)
+
+    async def prefetch_car(car_id: int) -> None:
+        async with semaphore:
+            await get_engine_volume(car_id, configuration_id, Priority.BACKGROUND)
+
+    try:
+        async with asyncio.timeout(settings.PREFETCH_BUDGET_SECONDS):
+            await asyncio.gather(*(prefetch_car(car_id) for car_id in car_ids), return_exceptions=True)
+    except TimeoutError:
+        pass
+
+
+def start_prefetch(user_id: int, car_ids: list[int], configuration_id: int) -> None:
+    cancel_prefetch(user_id)
+
+    if circuit_breakers.get('encar').is_open:
+        return
+
+    task = asyncio.create_task(prefetch_cars(car_ids, configuration_id))
+    _prefetch_tasks[user_id] = task
+
+    def forget(_: asyncio.Task) -> None:
+        if _prefetch_tasks.get(user_id) is task:
+            del _prefetch_tasks[user_id]
+
+    task.add_done_callback(forget)
+
 
+async def show_cars(
+        callback: CallbackQuery,
+        session: AsyncSession,
+        configuration_id: int,
+        cars_info: dict,
+        page: int = 0,
+        page_list: int = 0,
+        sort_by_price: bool = False
+):
+    visible_cars = cars_info['cars'][page_list * 5:page_list * 5 + 5]
+    start_prefetch(callback.from_user.id, [SearchCar.from_list(car).id for car in visible_cars], configuration_id)
+
+    prices = await calc_turnkey_prices([SearchCar.from_list(car) for car in visible_cars], configuration_id)
 
-async def show_cars(callback: CallbackQuery, session: AsyncSession, configuration_id: int, cars_info: dict, page: int = 0, page_list: int = 0):
     await callback.message.answer(
         f'По запросу найдено {cars_info['count']} авто:',
         reply_markup=await keyboards.show_cars(
@@ -189,9 +276,11 @@ async def show_cars(callback: CallbackQuery, session: AsyncSession, configuratio
             session,
             configuration_id,
             cars_info['cars'],
+            prices,
             cars_info['count'],
             page,
-            page_list
+            page_list,
+            sort_by_price
         )
     )
 
@@ -231,28 +320,35 @@ def add_spaces_for_number(number: int | str) -> str:
     return f'{int(number):,}'.replace(',', ' ')
 
 
-async def get_car_info_url(car_id: int | str) -> dict | None:
-    async with AsyncHTTPClient('https://example') as client:
-        html = await client.get(endpoint=f'/endpoint')
+async def get_car_info_url(car_id: int | str, priority: Priority = Priority.INTERACTIVE) -> CarDetail | None:
+    async def fetch_car_info() -> list | None:
+        async with AsyncHTTPClient('https://example', priority=priority, upstream='encar') as client:
+            html = await client.get(endpoint=f'/endpoint')
 
-    soup = BeautifulSoup(html, 'html.parser')
-    script_tag = soup.find('script', string=lambda text: '' in str(text))
+        if html:
+            return await parsing_executor.run(parse_car_detail, html)
 
-    if script_tag:
-        script_content = script_tag.string.split('' = ')[1].strip()
-        car_info = json.loads(script_content)
-        return car_info
+    values = await car_info_cache.get_or_fetch(str(car_id), fetch_car_info)
+    if values:
+        return CarDetail.from_list(values)
 
 
-async def get_engine_volume(car_id: str) -> int | None:
-    car_info = await get_car_info_url(car_id)
+async def invalidate_car_info(car_id: int | str) -> None:
+    await car_info_cache.invalidate(str(car_id))
+
+
+async def get_engine_volume(car_id: str, configuration_id: int | None = None, priority: Priority = Priority.INTERACTIVE) -> int | None:
+    car_info = await get_car_info_url(car_id, priority)
     if car_info:
-        return car_info['cars']['base']['spec']['displacement']
+        if configuration_id is not None:
+            await displacement_index.learn(configuration_id, car_id, car_info.displacement)
+        return car_info.displacement
 
 
-def cal_car_age(car_year: int, car_month: str) -> dict:
-    current_date_now_utc = datetime.now(UTC)
-    current_date_now_msc = current_date_now_utc.astimezone(pytz.timezone('Europe/Moscow'))
+def cal_car_age(car_year: int, car_month: str, current_date_now_msc: datetime | None = None) -> dict:
+    if current_date_now_msc is None:
+        current_date_now_utc = datetime.now(UTC)
+        current_date_now_msc = current_date_now_utc.astimezone(pytz.timezone('Europe/Moscow'))
     total_month = (current_date_now_msc.year - car_year) * 12 + (current_date_now_msc.month - int(car_month))
 
     year = total_month // 12
@@ -274,39 +370,7 @@ def calc_recycling_fee(car_age: int, engine_volume: int, is_electro: bool, is_al
     if is_almost_old:
         car_age += 1
 
-    if car_age < 3:
-        if is_electro:
-            base_coefficient = 0.17
-        else:
-            if engine_volume < 1_000:
-                base_coefficient = 0.17
-            elif 1_000 <= engine_volume < 2_000:
-                base_coefficient = 0.17
-            elif 2_000 <= engine_volume < 3_000:
-                base_coefficient = 0.17
-            elif 3_000 <= engine_volume < 3_500:
-                base_coefficient = 107.67
-            else:
-                base_coefficient = 137.11
-
-    else:
-        if is_electro:
-            base_coefficient = 0.26
-        else:
-            if engine_volume < 1_000:
-                base_coefficient = 0.26
-            elif 1_000 <= engine_volume < 2_000:
-                base_coefficient = 0.26
-            elif 2_000 <= engine_volume < 3_000:
-                base_coefficient = 0.26
-            elif 3_000 <= engine_volume < 3_500:
-                base_coefficient = 164.84
-            else:
-                base_coefficient = 180.24
-
-    recycling_fee = 20_000 * base_coefficient  # Утилизационный сбор
-
-    return int(recycling_fee)
+    return tariffs.tables.recycling_fee(car_age, engine_volume, is_electro)  # Утилизационный сбор
 
 
 def calc_custom_duty(car_age: int, car_price: int, engine_volume: int, is_almost_old: bool) -> int:
@@ -314,124 +378,123 @@ def calc_custom_duty(car_age: int, car_price: int, engine_volume: int, is_almost
     if is_almost_old:
         car_age += 1
 
-    if car_age < 3:
-        euro_price = car_price / settings.EUR_RATE
-        multiplier = 0.48
-
-        if euro_price < 8_500:
-            custom_duty = engine_volume * 2.5
-            multiplier = 0.54
-        elif 8_500 <= euro_price < 16_700:
-            custom_duty = engine_volume * 3.5
-        elif 16_700 <= euro_price < 42_300:
-            custom_duty = engine_volume * 5.5
-        elif 42_300 <= euro_price < 84_500:
-            custom_duty = engine_volume * 7.5
-        elif 84_500 <= euro_price < 169_000:
-            custom_duty = engine_volume * 15
-        else:
-            custom_duty = engine_volume * 20
-
-        if car_price * multiplier > custom_duty * settings.EUR_RATE:
-            return int(car_price * multiplier)
-        else:
-            return int(custom_duty * settings.EUR_RATE)
-
-    elif 3 <= car_age < 5:
-        if engine_volume < 1_000:
-            custom_duty = engine_volume * 1.5
-        elif 1_000 <= engine_volume < 1_500:
-            custom_duty = engine_volume * 1.7
-        elif 1_500 <= engine_volume < 1_800:
-            custom_duty = engine_volume * 2.5
-        elif 1_800 <= engine_volume < 2_300:
-            custom_duty = engine_volume * 2.7
-        elif 2_300 <= engine_volume < 3_000:
-            custom_duty = engine_volume * 3
-        else:
-            custom_duty = engine_volume * 3.6
-    else:
-        if engine_volume < 1_000:
-            custom_duty = engine_volume * 3
-        elif 1_000 <= engine_volume < 1_500:
-            custom_duty = engine_volume * 3.2
-        elif 1_500 <= engine_volume < 1_800:
-            custom_duty = engine_volume * 3.5
-        elif 1_800 <= engine_volume < 2_300:
-            custom_duty = engine_volume * 4.8
-        elif 2_300 <= engine_volume < 3_000:
-            custom_duty = engine_volume * 5
-        else:
-            custom_duty = engine_volume * 5.7
-
-    custom_duty = custom_duty * settings.EUR_RATE  # Таможенная пошлина
-    return int(custom_duty)
+    return tariffs.tables.custom_duty(car_age, car_price, engine_volume, rates.eur)  # Таможенная пошлина
 
 
 def calc_custom_clearance(car_price: int) -> int:
     # Таможенное оформление
+    return tariffs.tables.custom_clearance(car_price)
+
+
+def cal_is_almost_old(car_age: dict) -> bool:
+    # Авто, которому 3 года исполнится за время доставки, считается по ставке 3-5 лет
+    return car_age['year'] == 2 and car_age['month'] + 8 >= 12
+
+
+def calc_car_price(car_price: int, car_age: dict, engine_volume: int | None, is_electro: bool) -> dict:
+    """
+    Стоимость авто под ключ во Владивостоке (руб.) по цене в вонах.
+    Без объема двигателя пошлина и утильсбор не считаются ('-')
+    """
+
+    is_almost_old = cal_is_almost_old(car_age)
+    car_price_rub = int(car_price * rates.krw)
 
-    if car_price <= 200_000:
-        return 1_067
-    elif 200_000.01 <= car_price <= 450_000:
-        return 2_134
-    elif 450_000.01 <= car_price <= 1_200_000:
-        return 4_269
-    elif 1_200_000.01 <= car_price <= 2_700_000:
-        return 11_746
-    elif 2_700_000.01 <= car_price <= 4_200_000:
-        return 16_524
-    elif 4_200_000.01 <= car_price <= 5_500_000:
-        return 21_344
-    elif 5_500_000.01 <= car_price <= 7_000_000:
-        return 27_540
+    if engine_volume:
+        recycling_fee = calc_recycling_fee(car_age['year'], engine_volume, is_electro, is_almost_old)
+        custom_duty = calc_custom_duty(car_age['year'], car_price_rub, engine_volume, is_almost_old)
     else:
-        return 30_000
+        recycling_fee = '-'
+        custom_duty = '-'
 
+    custom_clearance = calc_custom_clearance(car_price_rub)
 
-async def get_car_info_text(car_info: dict, car_age: dict, is_url: bool = False):
-    if is_url:
-        brand_name = car_info['cars']['base']['category']['manufacturerEnglishName']
-        model_name = car_info['cars']['base']['category']['modelName']
-        grade_name = car_info['cars']['base']['category']['gradeEnglishName']
+    delivery_to_Vladivostok = int((car_price + 2_400_000) * rates.krw)
 
-        form_year = int(str(car_info['cars']['base']['category']['yearMonth'])[:4])
-        form_month = str(car_info['cars']['base']['category']['yearMonth'])[4:]
+    final_price = delivery_to_Vladivostok + custom_clearance + 110_000 + 150_000
+    if recycling_fee != '-':
+        final_price += recycling_fee + custom_duty
 
-        mileage = car_info['cars']['base']['spec']['mileage']
+    return {
+        'recycling_fee': recycling_fee,
+        'custom_duty': custom_duty,
+        'custom_clearance': custom_clearance,
+        'delivery_to_Vladivostok': delivery_to_Vladivostok,
+        'final_price': final_price
+    }
 
-        fuel_type = car_info['cars']['base']['spec']['fuelName']
 
-        car_price = int(car_info['cars']['base']['advertisement']['price'] * 10_000)
+async def calc_turnkey_prices(cars: list[SearchCar], configuration_id: int) -> list[int | None]:
+    """
+    Цены под ключ (руб.) для страницы результатов поиска за один проход: объемы двигателя берутся
+    из индекса одним запросом, страницы авто не загружаются. Если объем неизвестен - None
+    """
 
-        car_id = car_info['cars']['base']['queryCarId']
+    engine_volumes = await displacement_index.get_many(configuration_id, [car.id for car in cars])
 
-        engine_volume = car_info['cars']['base']['spec']['displacement']
-    else:
-        brand_name = car_info['Manufacturer']
-        model_name = car_info['Model']
-        grade_name = car_info['Badge']
+    current_date_now_msc = datetime.now(UTC).astimezone(pytz.timezone('Europe/Moscow'))
+
+    prices = []
+    for car, engine_volume in zip(cars, engine_volumes):
+        if not engine_volume:
+            prices.append(None)
+            continue
+
+        car_age = cal_car_age(int(str(car.year_month)[:4]), str(car.year_month)[4:], current_date_now_msc)
+        price = calc_car_price(int(car.price * 10_000), car_age, engine_volume, car.fuel_type == '전기')
+        prices.append(price['final_price'])
+
+    return prices
+
+
+async def sort_cars_by_price(cars_info: dict, configuration_id: int) -> dict:
+    """Сортирует загруженную страницу поиска по цене под ключ; авто без расчета - в конце в исходном порядке"""
+
+    cars = [SearchCar.from_list(values) for values in cars_info['cars']]
+    prices = await calc_turnkey_prices(cars, configuration_id)
+
+    order = sorted(range(len(cars)), key=lambda idx: (prices[idx] is None, prices[idx] or 0))
+
+    return {**cars_info, 'cars': [cars_info['cars'][idx] for idx in order]}
+
+
+async def resolve_engine_volume(car_id: int, configuration_id: int | None = None) -> int | None:
+    # В результатах поиска нет объема двигателя - он есть только на странице автомобиля,
+    # поэтому в каталоге сначала берем его из индекса так же, как для цен в списке (calc_turnkey_prices)
+    engine_volume = None
+    if configuration_id is not None:
+        engine_volume = await displacement_index.get(configuration_id, car_id)
+        await displacement_index.count(engine_volume is not None)
 
-        form_year = int(str(int(car_info['Year']))[:4])
-        form_month = str(int(car_info['Year']))[4:]
+    if engine_volume is None:
+        engine_volume = await get_engine_volume(car_id, configuration_id)
 
-        mileage = int(car_info['Mileage'])
+    return engine_volume
 
-        fuel_type = car_info['FuelType']
 
-        car_price = int(car_info['Price'] * 10_000)
+async def get_car_info_text(car_info: CarDetail | SearchCar, car_age: dict, is_url: bool = False, configuration_id: int | None = None):
+    brand_name = car_info.manufacturer
+    model_name = car_info.model
+    grade_name = car_info.grade
 
-        car_id = car_info['Id']
+    form_year = int(str(car_info.year_month)[:4])
+    form_month = str(car_info.year_month)[4:]
 
-        engine_volume = await get_engine_volume(car_id)
+    mileage = car_info.mileage
 
-    is_new = False
-    is_almost_old = False
-    if car_age['year'] < 3:
-        is_new = True
+    fuel_type = car_info.fuel_type
 
-        if car_age['year'] == 2 and car_age['month'] + 8 >= 12:
-            is_almost_old = True
+    car_price = int(car_info.price * 10_000)
+
+    car_id = car_info.id
+
+    if is_url:
+        engine_volume = car_info.displacement
+    else:
+        engine_volume = await resolve_engine_volume(car_id, configuration_id)
+
+    is_new = car_age['year'] < 3
+    is_almost_old = cal_is_almost_old(car_age)
 
 
     if is_new:
@@ -456,36 +519,17 @@ async def get_car_info_text(car_info: dict, car_age: dict, is_url: bool = False)
     else:
         faq_text = ''
 
-    car_price_rub = int(car_price * settings.KRW_RATE)
-
     if engine_volume:
         engine_volume_text = f'<b>Объем двигателя (см3)</b>: {engine_volume}\n'
-
-        recycling_fee = calc_recycling_fee(
-            car_age['year'],
-            engine_volume,
-            fuel_type == '전기',
-            is_almost_old
-        )
-
-        custom_duty = calc_custom_duty(
-            car_age['year'],
-            car_price_rub,
-            engine_volume,
-            is_almost_old
-        )
     else:
         engine_volume_text = ''
-        recycling_fee = '-'
-        custom_duty = '-'
 
-    custom_clearance = calc_custom_clearance(car_price_rub)
-
-    delivery_to_Vladivostok = int((car_price + 2_400_000) * settings.KRW_RATE)
-
-    final_price = delivery_to_Vladivostok + custom_clearance + 110_000 + 150_000
-    if recycling_fee != '-':
-        final_price += recycling_fee + custom_duty
+    price = calc_car_price(car_price, car_age, engine_volume, fuel_type == '전기')
+    recycling_fee = price['recycling_fee']
+    custom_duty = price['custom_duty']
+    custom_clearance = price['custom_clearance']
+    delivery_to_Vladivostok = price['delivery_to_Vladivostok']
+    final_price = price['final_price']
 
     return (
         f'<b>{translator(brand_name)} {translator(model_name)} {translator(grade_name)}</b>\n'
@@ -533,26 +577,25 @@ async def get_car_info_text(car_info: dict, car_age: dict, is_url: bool = False)
     )
 
 
-async def show_car_info(chat_id: int, car_info: dict, car_age: dict, is_support: bool = False, is_url: bool = True, state_data: dict = None) -> Message | list[Message]:
+async def show_car_info(chat_id: int, car_info: CarDetail, car_age: dict, is_support: bool = False, is_url: bool = True, state_data: dict = None) -> Message | list[Message]:
     if state_data is None:
         state_data = {}
 
-    text, text_2 = await get_car_info_text(car_info, car_age, is_url)
+    text, text_2 = await get_car_info_text(car_info, car_age, is_url, state_data.get('configuration_id'))
 
-    if car_info['cars']['base']['photos']:
+    if car_info.photos:
         media = []
-        for photo in car_info['cars']['base']['photos']:
-            if photo['type'] == 'OUTER':
-                base_url = 'https://example'
-                if media:
-                    media.append(InputMediaPhoto(media=base_url + photo['path']))
-                else:
-                    media.append(
-                        InputMediaPhoto(
-                            media=base_url + photo['path'],
-                            caption=text + text_2
-                        )
+        for photo in car_info.photos:
+            base_url = 'https://example'
+            if media:
+                media.append(InputMediaPhoto(media=base_url + photo))
+            else:
+                media.append(
+                    InputMediaPhoto(
+                        media=base_url + photo,
+                        caption=text + text_2
                     )
+                )
 
         try:
             msg = await bot.send_media_group(
@@ -581,9 +624,9 @@ async def show_car_info(chat_id: int, car_info: dict, car_age: dict, is_support:
         next_info_text = 'Выберите дальнейшее действие'
 
         if is_url:
-            next_info_kb = keyboards.create_statement_2(car_info['Id'], car_age)
+            next_info_kb = keyboards.create_statement_2(car_info.id, car_age)
         else:
-            next_info_kb = keyboards.create_statement(car_info['Id'], car_age, state_data('page', 0), state_data('page_list', 0))
+            next_info_kb = keyboards.create_statement(car_info.id, car_age, state_data.get('page', 0), state_data.get('page_list', 0))
 
         await bot.send_message(
             chat_id=chat_id,
@@ -679,7 +722,7 @@ async def show_track(chat_id: int, session: AsyncSession, track_id: int, is_supp
         )
 
 
-async def parse_cars(session: AsyncSession, track_id: int) -> list[int]:
+async def parse_cars(session: AsyncSession, track_id: int, priority: Priority = Priority.INTERACTIVE) -> list[int]:
     track_repo = TrackingRepository(session)
     configuration_repo = ConfigurationRepository(session)
 
@@ -722,20 +765,18 @@ async def parse_cars(session: AsyncSession, track_id: int) -> list[int]:
             start_price, end_price = track_info.price.split('-')
             start_price, end_price = int(start_price), int(end_price)
 
-            start_price = start_price * settings.KRW_RATE / 10_000
-            end_price = end_price * settings.KRW_RATE / 10_000
+            start_price = start_price * rates.krw / 10_000
+            end_price = end_price * rates.krw / 10_000
             configuration_action = configuration_action[:-1] + ''
         else:
-            KRW_price = int(track_info.price) * settings.KRW_RATE / 10_000
+            KRW_price = int(track_info.price) * rates.krw / 10_000
             configuration_action = configuration_action[:-1] + ''
 
     car_ids = []
     offset = 0
 
-    async with AsyncHTTPClient('https://example') as client:
+    async with AsyncHTTPClient('https://example', priority=priority, upstream='encar') as client:
         while True:
-            await asyncio.sleep(1)
-
             cars = await client.get(
                 endpoint='/endpoint',
                 params={
@@ -760,22 +801,22 @@ async def parse_cars(session: AsyncSession, track_id: int) -> list[int]:
     return car_ids
 
 
-async def activate_tracking(session: AsyncSession, track_id: int):
-    car_ids = await parse_cars(session, track_id)
+async def activate_tracking(session: AsyncSession, track_id: int, priority: Priority = Priority.INTERACTIVE):
+    car_ids = await parse_cars(session, track_id, priority)
     tracking_repo = TrackingRepository(session)
     await tracking_repo.update_car_ids(track_id, car_ids)
     await tracking_repo.activate_track(track_id)
 
 
-async def send_notification_to_admins(user_info: User, additional_text: str, car_id: int | str, car_age: dict) -> None:
+async def send_notification_to_admins(user_info: User, additional_text: str, car_info: CarDetail, car_age: dict) -> None:
+    """Карточка для админов строится из той же записи, что видел пользователь, - без повторной загрузки страницы"""
+
     username_text = f' @{user_info.username}' if user_info.username else ''
 
     text = (
         f'Пользователь <a href="tg://user?id={user_info.id}">{user_info.first_name}</a>{username_text} (ID: {user_info.id}) {additional_text}'
     )
 
-    car_info = await get_car_info_url(car_id)
-
     while True:
         try:
             msg = await show_car_info(settings.LOG_CHAT_ID, car_info, car_age, is_support=True)
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from bot import keyboards, functions
 from bot.states import CarFilter
 from services.filters import IsBlocked
+from services.catalog import refresh_if_stale
 from database.repository import generation, modification, configuration
 
 router = Router()
@@ -49,6 +50,7 @@ async def choice_generation(callback: CallbackQuery, state: FSMContext, session:
     """Вывод поколений выбранной модели автомобиля"""
 
     model_id = int(callback.data.split(':')[-1])
+    await refresh_if_stale(session, 'models', model_id)
 
     generation_repo = generation.GenerationRepository(session)
     generation_info = await generation_repo.get_generations(model_id)
@@ -69,6 +71,7 @@ async def choice_modification(callback: CallbackQuery, state: FSMContext, sessio
     """Вывод модификации выбранного поколения"""
 
     generation_id = int(callback.data.split(':')[-1])
+    await refresh_if_stale(session, 'generations', generation_id)
 
     modification_repo = modification.ModificationRepository(session)
     modification_info = await modification_repo.get_modifications(generation_id)
@@ -89,6 +92,7 @@ async def choice_configuration(callback: CallbackQuery, state: FSMContext, sessi
     """Вывод конфигурации выбранного модификации"""
 
     modification_id = int(callback.data.split(':')[-1])
+    await refresh_if_stale(session, 'modifications', modification_id)
 
     configuration_repo = configuration.ConfigurationRepository(session)
     configuration_info = await configuration_repo.get_configurations(modification_id)
@@ -107,6 +111,8 @@ async def choice_configuration(callback: CallbackQuery, state: FSMContext, sessi
 @router.callback_query(F.data.startswith('pre_check_auto:'), IsBlocked())
 async def pre_check_auto(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
     configuration_id = int(callback.data.split(':')[-1])
+    # Возврат из списка авто: предзагрузка карточек больше не нужна
+    functions.cancel_prefetch(callback.from_user.id)
 
     await callback.message.delete()
     await state.update_data(configuration_id=configuration_id)
@@ -239,7 +245,7 @@ async def confirm(callback: CallbackQuery, state: FSMContext, session: AsyncSess
         return await callback.message.answer('<b>Бот был перезагружен. Повторите процесс повторно.</b>')
 
     if cars_info:
-        await state.update_data(cars_info=cars_info, page=0, page_list=0)
+        await state.update_data(cars_info=cars_info, page=0, page_list=0, sort_by_price=False)
         await callback.message.delete()
         await functions.show_cars(callback, session, data['configuration_id'], cars_info)
     else:
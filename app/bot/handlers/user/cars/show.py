@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from bot import functions, keyboards
 from bot.states import CarInfo
 from services.filters import IsBlocked
+from services.records import SearchCar
 from database.repository.car_viewing_history import CarViewingHistoryRepository
 
 router = Router()
@@ -29,11 +30,48 @@ async def show_cars(callback: CallbackQuery, state: FSMContext, session: AsyncSe
             await callback.message.delete()
             return await callback.message.answer('<b>Бот был перезагружен. Повторите процесс повторно.</b>')
 
+        if not cars_info:
+            return await callback.message.answer('Произошла техническая ошибка')
+
+        if data.get('sort_by_price'):
+            cars_info = await functions.sort_cars_by_price(cars_info, data['configuration_id'])
+
         await state.update_data(cars_info=cars_info)
         data = await state.get_data()
 
     await state.update_data(page=page, page_list=page_list)
-    await functions.show_cars(callback, session, data['configuration_id'], data['cars_info'], page, page_list)
+    await functions.show_cars(
+        callback,
+        session,
+        data['configuration_id'],
+        data['cars_info'],
+        page,
+        page_list,
+        data.get('sort_by_price', False)
+    )
+
+
+@router.callback_query(F.data.startswith('sort_cars:'), IsBlocked())
+async def sort_cars(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
+    sort_by_price = callback.data.split(':')[-1] == '1'
+
+    data = await state.get_data()
+    await callback.message.delete()
+
+    try:
+        # Исходный порядок страницы берется из кэша поиска
+        cars_info = await functions.get_cards(data, data['page'], session)
+    except KeyError:
+        return await callback.message.answer('<b>Бот был перезагружен. Повторите процесс повторно.</b>')
+
+    if not cars_info:
+        return await callback.message.answer('Произошла техническая ошибка')
+
+    if sort_by_price:
+        cars_info = await functions.sort_cars_by_price(cars_info, data['configuration_id'])
+
+    await state.update_data(cars_info=cars_info, page_list=0, sort_by_price=sort_by_price)
+    await functions.show_cars(callback, session, data['configuration_id'], cars_info, data['page'], 0, sort_by_price)
 
 
 @router.callback_query(F.data.startswith('show_car:'), IsBlocked())
@@ -41,32 +79,36 @@ async def show_car(callback: CallbackQuery, state: FSMContext, session: AsyncSes
     idx_car = int(callback.data.split(':')[-1])
     data = await state.get_data()
 
-    car_info = data['cars_info']['cars'][data['page_list'] * 5:][idx_car]
+    car_info = SearchCar.from_list(data['cars_info']['cars'][data['page_list'] * 5:][idx_car])
 
     await callback.message.delete()
 
     car_age = functions.cal_car_age(
-        int(str(int(car_info['Year']))[:4]),
-        str(int(car_info['Year']))[4:]
+        int(str(car_info.year_month)[:4]),
+        str(car_info.year_month)[4:]
     )
 
-    await state.update_data(car_id=car_info['Id'], car_age=car_age)
+    await state.update_data(car_id=car_info.id, car_age=car_age)
+
+    # Объем двигателя определяется один раз: по нему считаются и карточка, и уведомление админам
+    engine_volume = await functions.resolve_engine_volume(car_info.id, data.get('configuration_id'))
+    car_detail = car_info.to_detail(engine_volume)
 
-    text, text_2 = await functions.get_car_info_text(car_info, car_age)
+    text, text_2 = await functions.get_car_info_text(car_detail, car_age, is_url=True)
 
-    if car_info['Photos']:
+    if car_info.photos:
         media = []
-        for i, photo in enumerate(car_info['Photos'][:10]):
+        for i, photo in enumerate(car_info.photos[:10]):
             base_url = 'https://ci.encar.com/carpicture'
             if i == 0:
                 media.append(
                     InputMediaPhoto(
-                        media=base_url + photo['location'],
+                        media=base_url + photo,
                         caption=text + text_2
                     )
                 )
             else:
-                media.append(InputMediaPhoto(media=base_url + photo['location']))
+                media.append(InputMediaPhoto(media=base_url + photo))
 
         try:
             await callback.message.answer_media_group(media=media)
@@ -81,13 +123,13 @@ async def show_car(callback: CallbackQuery, state: FSMContext, session: AsyncSes
 
     await callback.message.answer(
         text='Выберите дальнейшее действие',
-        reply_markup=keyboards.create_statement(car_info['Id'], car_age, data['page'], data['page_list'])
+        reply_markup=keyboards.create_statement(car_info.id, car_age, data['page'], data['page_list'])
     )
 
     car_view_repo = CarViewingHistoryRepository(session)
-    await car_view_repo.save(callback.from_user.id, int(car_info['Id']))
+    await car_view_repo.save(callback.from_user.id, car_info.id)
 
-    await functions.send_notification_to_admins(callback.from_user, 'рассчитал авто через каталог', car_info['Id'], car_age)
+    await functions.send_notification_to_admins(callback.from_user, 'рассчитал авто через каталог', car_detail, car_age)
 
 
 @router.callback_query(F.data == 'calc_link_encar', IsBlocked())
@@ -128,8 +170,8 @@ async def url_validate(message: Message, state: FSMContext, session: AsyncSessio
         await state.clear()
 
         car_age = functions.cal_car_age(
-            int(str(car_info['cars']['base']['category']['yearMonth'])[:4]),
-            str(car_info['cars']['base']['category']['yearMonth'])[4:]
+            int(str(car_info.year_month)[:4]),
+            str(car_info.year_month)[4:]
         )
 
         await functions.show_car_info(message.from_user.id, car_info, car_age)
@@ -138,7 +180,7 @@ async def url_validate(message: Message, state: FSMContext, session: AsyncSessio
         car_view_repo = CarViewingHistoryRepository(session)
         await car_view_repo.save(message.from_user.id, car_id)
 
-        await functions.send_notification_to_admins(message.from_user, 'рассчитал авто по ссылке', car_id, car_age)
+        await functions.send_notification_to_admins(message.from_user, 'рассчитал авто по ссылке', car_info, car_age)
 
     else:
         await message.answer('Ошибка получения информации по данной ссылке')
@@ -158,7 +200,7 @@ async def calc_link_encar_like_old(callback: CallbackQuery, state: FSMContext):
         await functions.send_notification_to_admins(
             callback.from_user,
             'рассчитал авто по ссылке и нажал на кнопку (3-5 лет)',
-            car_id,
+            car_info,
             {'year': 4, 'month': 0}
         )
     else:
@@ -183,7 +225,7 @@ async def calc_encar_like_old(callback: CallbackQuery, state: FSMContext):
         await functions.send_notification_to_admins(
             callback.from_user,
             'рассчитал авто через каталог и нажал на кнопку (3-5 лет)',
-            car_id,
+            car_info,
             {'year': 4, 'month': 0}
         )
     else:
@@ -14,6 +14,7 @@ router = Router()
 @router.callback_query(F.data.startswith('create_statement:'), IsBlocked())
 async def create_statement(callback: CallbackQuery, state: FSMContext):
     _, car_id = callback.data.split(':')
+    functions.cancel_prefetch(callback.from_user.id)
     await state.update_data(car_id=car_id)
 
     await functions.create_statement(callback, state)
@@ -50,8 +51,8 @@ async def contact_validate(message: Message, state: FSMContext):
             await state.clear()
 
             car_age = functions.cal_car_age(
-                int(str(car_info['cars']['base']['category']['yearMonth'])[:4]),
-                str(car_info['cars']['base']['category']['yearMonth'])[4:]
+                int(str(car_info.year_month)[:4]),
+                str(car_info.year_month)[4:]
             )
 
     await functions.send_notification_statement_to_admins(
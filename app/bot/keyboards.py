@@ -1,8 +1,9 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from bot.functions import reformat_mileage_text, reformat_price_text
+from bot.functions import reformat_mileage_text, reformat_price_text, reformat_price_text_2
 from services.utils import translator
+from services.records import SearchCar
 from database.models import Tracking
 from database.repository.brand import BrandRepository
 from database.repository.model import ModelRepository
@@ -179,21 +180,35 @@ def pre_check_auto(modification_id: int, is_tracking: bool):
     return kb
 
 
-async def show_cars(user_id: int, session: AsyncSession, configuration_id: int, cars: list[dict], cars_count: int, page: int, page_list: int):
+async def show_cars(
+        user_id: int,
+        session: AsyncSession,
+        configuration_id: int,
+        cars: list[list],
+        prices: list[int | None],
+        cars_count: int,
+        page: int,
+        page_list: int,
+        sort_by_price: bool
+):
     car_view_repo = CarViewingHistoryRepository(session)
     kb = InlineKeyboardMarkup(inline_keyboard=[])
 
     car_idx = 0
-    for idx, car in enumerate(cars[page_list * 5:page_list * 5 + 5], start=page_list * 5):
+    for (idx, values), price in zip(enumerate(cars[page_list * 5:page_list * 5 + 5], start=page_list * 5), prices):
+        car = SearchCar.from_list(values)
         is_viewed = False
 
-        if await car_view_repo.is_viewed(user_id, int(car['Id'])):
+        if await car_view_repo.is_viewed(user_id, car.id):
             is_viewed = True
 
+        # Цена под ключ, если известен объем двигателя, иначе цена в Корее
+        price_text = f'{reformat_price_text_2(price)}руб.' if price else reformat_price_text(car.price)
+
         kb.inline_keyboard.append(
             [
                 InlineKeyboardButton(
-                    text=f'{idx + 1}. {reformat_mileage_text(car['Mileage'])} {reformat_price_text(car['Price'])} ({car['FormYear']} г.в.) {'✅' if is_viewed else ''}',
+                    text=f'{idx + 1}. {reformat_mileage_text(car.mileage)} {price_text} ({car.form_year} г.в.) {'✅' if is_viewed else ''}',
                     callback_data=f'show_car:{car_idx}'
                 )
             ]
@@ -217,6 +232,15 @@ async def show_cars(user_id: int, session: AsyncSession, configuration_id: int,
     if pgn_btn:
         kb.inline_keyboard.append(pgn_btn)
 
+    kb.inline_keyboard.append(
+        [
+            InlineKeyboardButton(
+                text='Исходный порядок 🔃' if sort_by_price else 'Сначала дешевле (под ключ) 🔃',
+                callback_data=f'sort_cars:{0 if sort_by_price else 1}'
+            )
+        ]
+    )
+
     kb.inline_keyboard.append(
         [InlineKeyboardButton(text='К предыдущему пункту ◀️', callback_data=f'pre_check_auto:{configuration_id}')]
     )
@@ -28,6 +28,47 @@ class Settings(BaseSettings):
 
     LOG_LEVEL: str = Field(default='INFO')
 
+    CRAWL_CONCURRENCY_MODELS: int = Field(default=4, ge=1)
+    CRAWL_CONCURRENCY_GENERATIONS: int = Field(default=8, ge=1)
+    CRAWL_CONCURRENCY_MODIFICATIONS: int = Field(default=8, ge=1)
+    CRAWL_CONCURRENCY_CONFIGURATIONS: int = Field(default=8, ge=1)
+    CRAWL_DB_CONCURRENCY: int = Field(default=4, ge=1)
+    CRAWL_FULL_WEEKDAY: int = Field(default=6, ge=0, le=6)
+    CRAWL_RETRY_DELAY_MINUTES: int = Field(default=30, ge=1)
+    CRAWL_RESUME_HOURS: int = Field(default=20, ge=1)
+    CRAWL_LOCK_SECONDS: int = Field(default=300, ge=30)
+    CRAWL_MAX_ATTEMPTS: int = Field(default=3, ge=1)
+    CATALOG_STALE_HOURS: int = Field(default=24, ge=1)
+    CATALOG_REFRESH_LOCK_SECONDS: int = Field(default=300, ge=1)
+    HTTP_POOL_LIMIT: int = Field(default=100, ge=1)
+    HTTP_POOL_LIMIT_PER_HOST: int = Field(default=20, ge=1)
+    HTTP_DNS_CACHE_SECONDS: int = Field(default=300, ge=0)
+    HTTP_KEEPALIVE_SECONDS: int = Field(default=30, ge=1)
+    HTTP_RATE_LIMIT: float = Field(default=10, gt=0)
+    HTTP_RATE_MIN: float = Field(default=1, gt=0)
+    HTTP_RATE_BURST: int = Field(default=10, ge=1)
+    HTTP_RATE_INTERACTIVE_RESERVE: int = Field(default=3, ge=0)
+    HTTP_RETRY_ATTEMPTS: int = Field(default=3, ge=1)
+    HTTP_RETRY_DEADLINE: float = Field(default=15, gt=0)
+    HTTP_RETRY_ATTEMPTS_BACKGROUND: int = Field(default=5, ge=1)
+    HTTP_RETRY_DEADLINE_BACKGROUND: float = Field(default=120, gt=0)
+    CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5, ge=1)
+    CIRCUIT_RECOVERY_SECONDS: float = Field(default=60, gt=0)
+    SEARCH_CACHE_TTL: int = Field(default=120, ge=1)
+    SEARCH_CACHE_STALE_SECONDS: int = Field(default=600, ge=0)
+    CAR_INFO_CACHE_TTL: int = Field(default=1800, ge=1)
+    CAR_INFO_CACHE_SIZE: int = Field(default=500, ge=1)
+    PARSING_EXECUTOR: str = Field(default='auto', pattern='^(auto|process|thread|inline)$')
+    PARSING_WORKERS: int = Field(default=2, ge=1)
+    PARSING_MAX_PENDING: int = Field(default=8, ge=1)
+    LOOP_LAG_TARGET_MS: int = Field(default=100, ge=1)
+    PREFETCH_CONCURRENCY: int = Field(default=2, ge=1)
+    PREFETCH_BUDGET_SECONDS: float = Field(default=20, gt=0)
+    DISPLACEMENT_MIN_SAMPLES: int = Field(default=3, ge=1)
+    DISPLACEMENT_CONFIDENCE: float = Field(default=0.9, gt=0, le=1)
+    DISPLACEMENT_TTL_DAYS: int = Field(default=30, ge=1)
+    TARIFFS_PATH: str | None = Field(default=None)
+
     @field_validator('ADMIN_IDS', mode='before')
     def parse_admin_ids(cls, value: Union[str, int, List[int]]) -> List[int]:
         if isinstance(value, list):
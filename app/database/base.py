@@ -1,7 +1,8 @@
 from contextlib import asynccontextmanager
 
+from sqlalchemy import Column, text
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncConnection, async_sessionmaker
 
 from config import settings
 
@@ -34,3 +35,13 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+
+async def add_missing_columns(connection: AsyncConnection, columns: tuple[Column, ...]) -> None:
+    """Добавляет в существующие таблицы колонки, появившиеся в моделях позже (повторный запуск ничего не меняет)"""
+
+    for column in columns:
+        column_type = column.type.compile(dialect=connection.dialect)
+        await connection.execute(
+            text(f'ALTER TABLE {column.table.name} ADD COLUMN IF NOT EXISTS {column.name} {column_type}')
+        )
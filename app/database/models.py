@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, UniqueConstraint, BigInteger, ARRAY, DateTime, func, Boolean
+from sqlalchemy import Column, Integer, String, UniqueConstraint, BigInteger, ARRAY, DateTime, func, Boolean, Float
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -14,6 +15,7 @@ class Brand(Base):
     action = Column(String(length=255))
     display_value = Column(String(length=255))
     eng_name = Column(String(length=100))
+    count = Column(Integer)
 
     __table_args__ = (UniqueConstraint('code', name='uq_brand_code'),)
 
@@ -27,6 +29,7 @@ class Model(Base):
     display_value = Column(String(length=255))
     eng_name = Column(String(length=100))
     brand_id = Column(Integer)
+    count = Column(Integer)
 
     __table_args__ = (UniqueConstraint('code', 'brand_id', name='uq_code_brand_id'), )
 
@@ -41,6 +44,7 @@ class Generation(Base):
     model_id = Column(Integer)
     start_year = Column(Integer)
     end_year = Column(Integer)
+    count = Column(Integer)
 
     __table_args__ = (UniqueConstraint('code', 'model_id', name='uq_code_model_id'),)
 
@@ -53,6 +57,7 @@ class Modification(Base):
     action = Column(String(length=255))
     display_value = Column(String(length=255))
     generation_id = Column(Integer)
+    count = Column(Integer)
 
     __table_args__ = (UniqueConstraint('code', 'generation_id', name='uq_code_generation_id'),)
 
@@ -103,3 +108,27 @@ class CarViewingHistory(Base):
     user_id = Column(BigInteger)
     car_id = Column(BigInteger)
     viewed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CrawlRun(Base):
+    __tablename__ = 'crawl_runs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    mode = Column(String(length=20))
+    duration = Column(Float)
+    requests = Column(Integer)
+    bytes = Column(BigInteger)
+    retries = Column(Integer)
+    errors = Column(Integer)
+    failed = Column(Integer)
+    levels = Column(JSONB)
+    finished_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Колонки, добавленные в уже существующие таблицы: create_all создает только отсутствующие таблицы
+ADDED_COLUMNS = (
+    Brand.__table__.c['count'],
+    Model.__table__.c['count'],
+    Generation.__table__.c['count'],
+    Modification.__table__.c['count'],
+)
@@ -1,6 +1,5 @@
 from sqlalchemy import select, case
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
 
 from database.models import Brand
 
@@ -10,26 +9,6 @@ class BrandRepository:
         self.model = Brand
         self.session = session
 
-    async def update_brands(self, brands: list[dict]) -> None:
-        stmt = insert(Brand).values(brands)
-
-        await self.session.execute(
-            stmt.on_conflict_do_update(
-                constraint='uq_brand_code',
-                set_={
-                    'action': stmt.excluded.action,
-                    'display_value': stmt.excluded.display_value,
-                    'eng_name': stmt.excluded.eng_name
-                }
-            ),
-            execution_options={'echo': False}
-        )
-        await self.session.commit()
-
-    async def get_all_brands_actions(self) -> list[tuple]:
-        result = await self.session.execute(select(Brand.id, Brand.action))
-        return result.all()
-
     async def get_brands(self, page: int) -> list[tuple]:
         priority_brands = [
             'BMW',
@@ -0,0 +1,206 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Brand, Model, Generation, Modification, Configuration
+
+# Уровень каталога: (модель, уникальный ключ, обновляемые поля)
+CATALOG_TABLES = {
+    'brands': (Brand, ('code',), ('action', 'display_value', 'eng_name', 'count')),
+    'models': (Model, ('code', 'brand_id'), ('action', 'display_value', 'eng_name', 'count')),
+    'generations': (Generation, ('code', 'model_id'), ('action', 'display_value', 'start_year', 'end_year', 'count')),
+    'modifications': (Modification, ('code', 'generation_id'), ('action', 'display_value', 'count')),
+    'configurations': (Configuration, ('code', 'modification_id'), ('action', 'display_value', 'count')),
+}
+
+# Уровень каталога -> уровень родителя
+PARENT_LEVELS = {
+    'generations': 'models',
+    'modifications': 'generations',
+    'configurations': 'modifications',
+}
+
+# Новая версия каталога собирается в таблицах *_next, предыдущая опубликованная хранится в *_prev
+SNAPSHOT_SUFFIX = '_next'
+PREVIOUS_SUFFIX = '_prev'
+
+
+class CatalogRepository:
+    def __init__(self, session: AsyncSession, snapshot: bool = False):
+        self.session = session
+        self.suffix = SNAPSHOT_SUFFIX if snapshot else ''
+
+    def _table(self, level: str) -> str:
+        model, _, _ = CATALOG_TABLES[level]
+        return f'{model.__tablename__}{self.suffix}'
+
+    async def get_counts(self, level: str, parent_id: int | None) -> dict[str, int]:
+        _, keys, _ = CATALOG_TABLES[level]
+
+        if len(keys) == 1:
+            result = await self.session.execute(text(f'SELECT code, count FROM {self._table(level)}'))
+        else:
+            result = await self.session.execute(
+                text(f'SELECT code, count FROM {self._table(level)} WHERE {keys[1]} = :parent_id'),
+                {'parent_id': parent_id}
+            )
+
+        return dict(result.all())
+
+    async def get_action(self, level: str, node_id: int) -> str | None:
+        result = await self.session.execute(
+            text(f'SELECT action FROM {self._table(level)} WHERE id = :id'),
+            {'id': node_id}
+        )
+        return result.scalar()
+
+    async def _stage(self, level: str, rows: list[dict]) -> str:
+        """Загружает строки уровня через COPY во временную таблицу и возвращает ее имя"""
+
+        model, keys, fields = CATALOG_TABLES[level]
+        staging = f'staging_{model.__tablename__}'
+        columns = keys + fields
+        columns_sql = ', '.join(columns)
+
+        # Временная таблица не пишется в WAL и своя у каждого соединения,
+        # поэтому параллельные воркеры обхода не мешают друг другу
+        await self.session.execute(
+            text(
+                f'CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DELETE ROWS '
+                f'AS SELECT {columns_sql} FROM {model.__tablename__} WITH NO DATA'
+            )
+        )
+
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            staging,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=columns
+        )
+
+        return staging
+
+    async def _saved(self, level: str, staging: str) -> list[tuple]:
+        _, keys, _ = CATALOG_TABLES[level]
+        keys_sql = ', '.join(keys)
+
+        result = await self.session.execute(
+            text(
+                f'SELECT target.id, target.action, target.code FROM {self._table(level)} AS target '
+                f'JOIN (SELECT DISTINCT {keys_sql} FROM {staging}) AS staging USING ({keys_sql})'
+            ),
+            execution_options={'echo': False}
+        )
+        return result.all()
+
+    async def match(self, level: str, rows: list[dict]) -> tuple[list[tuple], int]:
+        """
+        Сверяет строки уровня с таблицей без записи в нее.
+        Возвращает (id, action, code) найденных строк и число новых или изменившихся строк
+        """
+
+        _, keys, fields = CATALOG_TABLES[level]
+        staging = await self._stage(level, rows)
+        keys_sql = ', '.join(keys)
+        fields_sql = ', '.join(f'target.{field}' for field in fields)
+        staged_sql = ', '.join(f'staging.{field}' for field in fields)
+
+        result = await self.session.execute(
+            text(
+                f'SELECT count(*) FROM (SELECT DISTINCT ON ({keys_sql}) * FROM {staging}) AS staging '
+                f'LEFT JOIN {self._table(level)} AS target USING ({keys_sql}) '
+                f'WHERE target.id IS NULL OR ({fields_sql}) IS DISTINCT FROM ({staged_sql})'
+            ),
+            execution_options={'echo': False}
+        )
+        changed = result.scalar()
+
+        saved = await self._saved(level, staging)
+        await self.session.commit()
+
+        return saved, changed
+
+    async def bulk_update(self, level: str, rows: list[dict]) -> tuple[list[tuple], dict[str, int]]:
+        """
+        Загрузка строк уровня каталога через COPY во временную таблицу
+        и одно слияние INSERT ... SELECT ... ON CONFLICT в основную таблицу.
+        Возвращает (id, action, code) всех загруженных строк и число вставленных/обновленных/неизмененных
+        """
+
+        _, keys, fields = CATALOG_TABLES[level]
+        table = self._table(level)
+        staging = await self._stage(level, rows)
+        columns = keys + fields
+
+        columns_sql = ', '.join(columns)
+        keys_sql = ', '.join(keys)
+        updates_sql = ', '.join(f'{field} = EXCLUDED.{field}' for field in fields)
+        fields_sql = ', '.join(f'target.{field}' for field in fields)
+        excluded_sql = ', '.join(f'EXCLUDED.{field}' for field in fields)
+
+        # Строки без изменений не перезаписываются, чтобы не плодить мертвые кортежи и WAL
+        result = await self.session.execute(
+            text(
+                f'WITH upserted AS ('
+                f'INSERT INTO {table} AS target ({columns_sql}) '
+                f'SELECT DISTINCT ON ({keys_sql}) {columns_sql} FROM {staging} '
+                f'ON CONFLICT ({keys_sql}) DO UPDATE SET {updates_sql} '
+                f'WHERE ({fields_sql}) IS DISTINCT FROM ({excluded_sql}) '
+                f'RETURNING (xmax = 0) AS inserted'
+                f') '
+                f'SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted'
+            ),
+            execution_options={'echo': False}
+        )
+        inserted, updated = result.one()
+
+        saved = await self._saved(level, staging)
+
+        await self.session.commit()
+
+        return saved, {
+            'inserted': inserted,
+            'updated': updated,
+            'unchanged': len(saved) - inserted - updated
+        }
+
+    async def snapshot_exists(self) -> bool:
+        result = await self.session.execute(
+            text('SELECT to_regclass(:table) IS NOT NULL'),
+            {'table': f'{Configuration.__tablename__}{SNAPSHOT_SUFFIX}'}
+        )
+        return result.scalar()
+
+    async def drop_snapshot(self) -> None:
+        for model, _, _ in CATALOG_TABLES.values():
+            await self.session.execute(text(f'DROP TABLE IF EXISTS {model.__tablename__}{SNAPSHOT_SUFFIX}'))
+
+        await self.session.commit()
+
+    async def prepare_snapshot(self) -> None:
+        """Создает новую версию каталога как копию опубликованной (с теми же id и индексами)"""
+
+        await self.drop_snapshot()
+
+        for model, _, _ in CATALOG_TABLES.values():
+            table = model.__tablename__
+            await self.session.execute(text(f'CREATE TABLE {table}{SNAPSHOT_SUFFIX} (LIKE {table} INCLUDING ALL)'))
+            await self.session.execute(text(f'INSERT INTO {table}{SNAPSHOT_SUFFIX} SELECT * FROM {table}'))
+
+        await self.session.commit()
+
+    async def publish_snapshot(self) -> None:
+        """
+        Атомарно подменяет опубликованные таблицы собранными: все переименования идут в одной транзакции,
+        поэтому читатели видят либо старую, либо новую версию целиком. Версия до предыдущей удаляется
+        """
+
+        for model, _, _ in CATALOG_TABLES.values():
+            table = model.__tablename__
+            await self.session.execute(text(f'DROP TABLE IF EXISTS {table}{PREVIOUS_SUFFIX}'))
+            await self.session.execute(text(f'ALTER TABLE {table} RENAME TO {table}{PREVIOUS_SUFFIX}'))
+            await self.session.execute(text(f'ALTER TABLE {table}{SNAPSHOT_SUFFIX} RENAME TO {table}'))
+            # Последовательность id общая для всех версий и не должна удалиться вместе с *_prev
+            await self.session.execute(text(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id'))
+
+        await self.session.commit()
@@ -1,6 +1,5 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
 
 from database.models import Configuration
 
@@ -10,22 +9,6 @@ class ConfigurationRepository:
         self.model = Configuration
         self.session = session
 
-    async def update_configurations(self, configurations: list[dict]):
-        stmt = insert(Configuration).values(configurations)
-
-        await self.session.execute(
-            stmt.on_conflict_do_update(
-                constraint='uq_code_modification_id',
-                set_={
-                    'action': stmt.excluded.action,
-                    'display_value': stmt.excluded.display_value,
-                    'count': stmt.excluded.count
-                }
-            ),
-            execution_options={'echo': False}
-        )
-        await self.session.commit()
-
     async def get_all_configuration_action(self, modification_id: int) -> list[tuple]:
         result = await self.session.execute(select(Configuration.action).where(Configuration.id == modification_id))
         return result.scalar()
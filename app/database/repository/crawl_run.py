@@ -0,0 +1,36 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+
+from database.models import CrawlRun
+
+
+class CrawlRunRepository:
+    def __init__(self, session: AsyncSession):
+        self.model = CrawlRun
+        self.session = session
+
+    async def save(self, mode: str, duration: float, levels: dict[str, dict]) -> None:
+        await self.session.execute(
+            insert(CrawlRun).
+            values(
+                mode=mode,
+                duration=duration,
+                requests=sum(stats['requests'] for stats in levels.values()),
+                bytes=sum(stats['bytes'] for stats in levels.values()),
+                retries=sum(stats['retries'] for stats in levels.values()),
+                errors=sum(stats['errors'] for stats in levels.values()),
+                failed=sum(stats['failed'] for stats in levels.values()),
+                levels=levels
+            )
+        )
+        await self.session.commit()
+
+    async def get_last(self, mode: str) -> CrawlRun | None:
+        result = await self.session.execute(
+            select(CrawlRun)
+            .where(CrawlRun.mode == mode)
+            .order_by(CrawlRun.finished_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
@@ -1,6 +1,5 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
 
 from database.models import Modification
 
@@ -10,25 +9,6 @@ class ModificationRepository:
         self.model = Modification
         self.session = session
 
-    async def update_modifications(self, modifications: list[dict]):
-        stmt = insert(Modification).values(modifications)
-
-        await self.session.execute(
-            stmt.on_conflict_do_update(
-                constraint='uq_code_generation_id',
-                set_={
-                    'action': stmt.excluded.action,
-                    'display_value': stmt.excluded.display_value
-                }
-            ),
-            execution_options={'echo': False}
-        )
-        await self.session.commit()
-
-    async def get_all_modification_actions(self) -> list[tuple]:
-        result = await self.session.execute(select(Modification.id, Modification.action))
-        return result.all()
-
     async def get_modifications(self, generation_id: int) -> list[tuple]:
         result = await self.session.execute(
             select(Modification.id, Modification.display_value)
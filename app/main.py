@@ -7,17 +7,21 @@ import pytz
 from bot import bot, dp
 from bot.handlers import router
 
-from database.base import engine
+from database.base import engine, add_missing_columns
 from database.models import *
 
 from utils.logger import setup_logger
 from utils.scheduler import scheduler
+from services.utils import http_sessions
+from services.parsing import parsing_executor, monitor_loop_lag
+from services.rates import rates
 
 from tasks.auth_encar import auth_encar_task
 from tasks.check_new_cars import check_new_cars_task
 from tasks.currency_update import KRW_updates_task
-from tasks.daily_parsing import daily_parsing_task
-from tasks.daily_statistics import daily_statistics_task
+from tasks.daily_parsing import daily_parsing_task, resume_parsing_task
+from tasks.daily_statistics import daily_statistics_task, cache_statistics_task
+from tasks.tariffs_reload import tariffs_reload_task
 
 from middleware.database import DatabaseMiddleware
 from middleware.error_handler import ErrorHandlerMiddleware
@@ -28,7 +32,12 @@ logger = setup_logger(__name__)
 
 @asynccontextmanager
 async def lifespan():
+    loop_lag_task = asyncio.create_task(monitor_loop_lag())
+    rates_listener_task = asyncio.create_task(rates.listen())
+
     try:
+        http_sessions.open()
+        parsing_executor.start()
         scheduler.start()
 
         current_time = datetime.now(pytz.timezone('Europe/Moscow'))
@@ -47,6 +56,16 @@ async def lifespan():
             id='daily_statistics',
         )
 
+        scheduler.add_job(
+            cache_statistics_task,
+            trigger='cron',
+            hour=0,
+            minute=0,
+            second=0,
+            next_run_time=next_run_time_for_daily_tasks,
+            id='cache_statistics'
+        )
+
         scheduler.add_job(
             daily_parsing_task,
             trigger='cron',
@@ -57,6 +76,14 @@ async def lifespan():
             id='daily_parsing'
         )
 
+        scheduler.add_job(
+            resume_parsing_task,
+            trigger='date',
+            run_date=current_time,
+            next_run_time=current_time,
+            id='daily_parsing_resume'
+        )
+
         scheduler.add_job(
             auth_encar_task,
             trigger='interval',
@@ -73,6 +100,14 @@ async def lifespan():
             id='KRW_updates'
         )
 
+        scheduler.add_job(
+            tariffs_reload_task,
+            trigger='interval',
+            minutes=1,
+            next_run_time=current_time,
+            id='tariffs_reload'
+        )
+
         scheduler.add_job(
             check_new_cars_task,
             trigger='interval',
@@ -88,6 +123,10 @@ async def lifespan():
         raise
     finally:
         scheduler.shutdown()
+        loop_lag_task.cancel()
+        rates_listener_task.cancel()
+        parsing_executor.shutdown()
+        await http_sessions.close()
         logger.info('Отключение бота')
 
 
@@ -99,6 +138,7 @@ async def main():
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await add_missing_columns(conn, ADDED_COLUMNS)
 
     async with lifespan():
         await dp.start_polling(bot)
@@ -0,0 +1,182 @@
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from redis.asyncio import Redis
+
+from services.single_flight import SingleFlight
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RedisCache:
+    """
+    Общий для всех процессов бота кэш в Redis со stale-while-revalidate:
+    свежее значение (моложе ttl) отдается сразу; устаревшее, но моложе ttl + stale_ttl, тоже отдается сразу,
+    а в фоне один процесс перезапрашивает его. Счетчики попаданий и сэкономленного времени лежат в Redis
+    """
+
+    def __init__(self, redis: Redis, prefix: str, ttl: int, stale_ttl: int = 0):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats_key = f'{prefix}:stats'
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+    def _key(self, key: str) -> str:
+        return f'{self.prefix}:{hashlib.sha1(key.encode()).hexdigest()}'
+
+    async def _count(self, field: str, saved: float = 0) -> None:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hincrby(self.stats_key, field, 1)
+                if saved:
+                    pipe.hincrbyfloat(self.stats_key, 'saved', saved)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f'Ошибка записи статистики кэша {self.prefix}: {str(e)}')
+
+    async def get(self, key: str) -> dict | None:
+        """Конверт {'data', 'fetched_at', 'latency'} или None"""
+
+        try:
+            raw = await self.redis.get(self._key(key))
+        except Exception as e:
+            logger.error(f'Ошибка чтения кэша {self.prefix}: {str(e)}')
+            return None
+
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, data: Any, latency: float = 0) -> None:
+        envelope = {'data': data, 'fetched_at': time.time(), 'latency': latency}
+
+        try:
+            await self.redis.set(self._key(key), json.dumps(envelope), ex=self.ttl + self.stale_ttl)
+        except Exception as e:
+            logger.error(f'Ошибка записи кэша {self.prefix}: {str(e)}')
+
+    async def invalidate(self, key: str) -> None:
+        await self.redis.delete(self._key(key))
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        started_at = time.perf_counter()
+        data = await fetch()
+
+        # Пустой ответ (ошибка источника) не кэшируется
+        if data is not None:
+            await self.set(key, data, time.perf_counter() - started_at)
+
+        return data
+
+    async def _revalidate(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            # Перезапрос выполняет только один процесс
+            if await self.redis.set(f'{self._key(key)}:lock', 1, nx=True, ex=max(self.ttl, 1)):
+                await self._fetch(key, fetch)
+        except Exception as e:
+            logger.error(f'Ошибка обновления кэша {self.prefix}: {str(e)}')
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        envelope = await self.get(key)
+
+        if envelope is None:
+            await self._count('misses')
+            return await self._fetch(key, fetch)
+
+        if time.time() - envelope['fetched_at'] >= self.ttl:
+            await self._count('stale', envelope['latency'])
+            task = asyncio.create_task(self._revalidate(key, fetch))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        else:
+            await self._count('hits', envelope['latency'])
+
+        return envelope['data']
+
+    async def stats(self, reset: bool = False) -> dict[str, float]:
+        """Попадания (свежие и устаревшие), промахи, доля попаданий и сэкономленные секунды"""
+
+        raw = await self.redis.hgetall(self.stats_key)
+        if reset:
+            await self.redis.delete(self.stats_key)
+
+        hits, stale, misses = int(raw.get('hits', 0)), int(raw.get('stale', 0)), int(raw.get('misses', 0))
+        total = hits + stale + misses
+
+        return {
+            'hits': hits,
+            'stale': stale,
+            'misses': misses,
+            'hit_rate': (hits + stale) / total if total else 0,
+            'saved': float(raw.get('saved', 0))
+        }
+
+
+class LRUCache:
+    """Ограниченный по числу записей кэш процесса с TTL: при переполнении вытесняется давно не использованная запись"""
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        item = self.items.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self.items[key]
+            return None
+
+        self.items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.items[key] = (time.monotonic() + self.ttl, value)
+        self.items.move_to_end(key)
+
+        while len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        self.items.pop(key, None)
+
+
+class TieredCache:
+    """
+    Двухуровневый кэш: LRU в памяти процесса перед общим кэшем в Redis.
+    Промах обоих уровней вызывает fetch, результат сохраняется в оба.
+    Одновременные промахи по одному ключу (например, предзагрузка и клик по авто) ждут одну загрузку
+    """
+
+    def __init__(self, local: LRUCache, remote: RedisCache):
+        self.local = local
+        self.remote = remote
+        self.local_hits = 0
+        self.in_flight = SingleFlight()
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        data = self.local.get(key)
+        if data is not None:
+            self.local_hits += 1
+            return data
+
+        return await self.in_flight.do(key, lambda: self._fetch(key, fetch))
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        data = await self.remote.get_or_fetch(key, fetch)
+        if data is not None:
+            self.local.set(key, data)
+
+        return data
+
+    async def invalidate(self, key: str) -> None:
+        self.local.invalidate(key)
+        await self.remote.invalidate(key)
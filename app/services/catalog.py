@@ -0,0 +1,278 @@
+import time
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot import redis_client
+from config import settings
+from utils.logger import setup_logger
+from utils.exceptions import APIError
+from database.base import get_db
+from services.utils import AsyncHTTPClient
+from services.rate_limiter import Priority
+from services.circuit_breaker import circuit_breakers
+from services.crawler import CatalogCrawler, CrawlLevel, CrawlFrontier
+from services.facets import FacetPath, is_selected, is_not_year_group, is_selected_not_year_group
+from database.repository.catalog import CatalogRepository, CATALOG_TABLES, PARENT_LEVELS
+
+logger = setup_logger(__name__)
+
+# Уровень узла -> уровень его детей, которые можно обновить по запросу пользователя
+CHILD_LEVELS = {parent: child for child, parent in PARENT_LEVELS.items()}
+
+_refresh_tasks: dict[tuple[str, int], asyncio.Task] = {}
+
+
+BRANDS_PATH = FacetPath('CarType', (is_selected,))
+MODELS_PATH = FacetPath('CarType', (is_selected, is_selected))
+GENERATIONS_PATH = FacetPath('CarType', (is_selected, is_selected, is_selected))
+MODIFICATIONS_PATH = FacetPath('CarType', (is_selected, is_selected, is_selected, is_selected), emit=is_not_year_group)
+CONFIGURATIONS_PATH = FacetPath('CarType', (is_selected, is_selected, is_selected, is_selected, is_selected_not_year_group))
+
+
+def parse_year(date: list | None) -> int | None:
+    if date and date != [None]:
+        return int(date[0][:4])
+
+
+def parse_brands(brands_data: dict, _: None = None) -> list[dict]:
+    return [
+        {
+            'code': brand['Metadata']['Code'][0],
+            'action': brand['Action'],
+            'display_value': brand['DisplayValue'],
+            'eng_name': brand['Metadata']['EngName'][0],
+            'count': brand['Count']
+        }
+        for brand in BRANDS_PATH.extract(brands_data)
+    ]
+
+
+def parse_models(models_data: dict, brand_id: int) -> list[dict]:
+    return [
+        {
+            'code': model['Metadata']['Code'][0],
+            'action': model['Action'],
+            'display_value': model['DisplayValue'],
+            'eng_name': model['Metadata']['EngName'][0],
+            'brand_id': brand_id,
+            'count': model['Count']
+        }
+        for model in MODELS_PATH.extract(models_data)
+    ]
+
+
+def parse_generations(generations_data: dict, model_id: int) -> list[dict]:
+    return [
+        {
+            'code': generation['Metadata']['Code'][0],
+            'action': generation['Action'],
+            'display_value': generation['DisplayValue'],
+            'model_id': model_id,
+            'start_year': parse_year(generation['Metadata']['ModelStartDate']),
+            'end_year': parse_year(generation['Metadata']['ModelEndDate']),
+            'count': generation['Count']
+        }
+        for generation in GENERATIONS_PATH.extract(generations_data)
+    ]
+
+
+def parse_modifications(modifications_data: dict, generation_id: int) -> list[dict]:
+    return [
+        {
+            'code': modification['Metadata']['Code'][0],
+            'action': modification['Action'],
+            'display_value': modification['DisplayValue'],
+            'generation_id': generation_id,
+            'count': modification['Count']
+        }
+        for modification in MODIFICATIONS_PATH.extract(modifications_data)
+    ]
+
+
+def parse_configurations(configurations_data: dict, modification_id: int) -> list[dict]:
+    return [
+        {
+            'code': configuration['Metadata']['Code'][0],
+            'action': configuration['Action'],
+            'display_value': configuration['DisplayValue'],
+            'modification_id': modification_id,
+            'count': configuration['Count']
+        }
+        for configuration in CONFIGURATIONS_PATH.extract(configurations_data)
+    ]
+
+
+PARSERS = {
+    'brands': parse_brands,
+    'models': parse_models,
+    'generations': parse_generations,
+    'modifications': parse_modifications,
+    'configurations': parse_configurations
+}
+
+
+def _refreshed_key(level: str) -> str:
+    return f'catalog:refreshed:{level}'
+
+
+async def mark_refreshed(level: str, node_ids: set[int]) -> None:
+    """
+    Отмечает время загрузки детей узлов. Хранится в Redis, а не в таблицах каталога:
+    иначе каждый обход перезаписывал бы все строки родителей, даже когда дети не изменились
+    """
+
+    try:
+        await redis_client.hset(_refreshed_key(level), mapping={node_id: time.time() for node_id in node_ids})
+    except Exception as e:
+        logger.error(f'Ошибка записи времени обновления каталога {level}: {str(e)}')
+
+
+async def get_refreshed_at(level: str, node_id: int) -> float | None:
+    refreshed_at = await redis_client.hget(_refreshed_key(level), str(node_id))
+    return float(refreshed_at) if refreshed_at else None
+
+
+class CatalogSnapshot:
+    """
+    Версия каталога, которую собирает обход. Копия опубликованных таблиц в *_next создается
+    только перед первой записью: пока ответы encar совпадают с каталогом, обход лишь сверяет строки
+    """
+
+    def __init__(self, ready: bool = False):
+        self.ready = ready
+        self._lock = asyncio.Lock()
+
+    async def ensure(self) -> None:
+        async with self._lock:
+            if self.ready:
+                return
+
+            async with get_db() as session:
+                catalog_repo = CatalogRepository(session)
+                await catalog_repo.prepare_snapshot()
+
+            self.ready = True
+            logger.info('Каталог изменился, создана новая версия для сборки')
+
+
+def rows_saver(level: str, snapshot: CatalogSnapshot | None = None):
+    """Сохранение строк уровня: в собираемую версию каталога или, без snapshot, в опубликованные таблицы"""
+
+    parent_key = CATALOG_TABLES[level][1][-1]
+
+    async def save_rows(rows: list[dict]) -> tuple[list[tuple], dict[str, int]]:
+        # Обход мог начаться, пока ветка загружалась по запросу пользователя
+        if snapshot is None and await CrawlFrontier(redis_client).is_locked():
+            raise APIError('Идет обход каталога, запись в опубликованные таблицы отменена')
+
+        result = None
+
+        if snapshot is not None and not snapshot.ready:
+            async with get_db() as session:
+                catalog_repo = CatalogRepository(session)
+                saved, changed = await catalog_repo.match(level, rows)
+
+            if changed:
+                await snapshot.ensure()
+            else:
+                result = saved, {'inserted': 0, 'updated': 0, 'unchanged': len(saved)}
+
+        if result is None:
+            async with get_db() as session:
+                catalog_repo = CatalogRepository(session, snapshot is not None)
+                result = await catalog_repo.bulk_update(level, rows)
+
+        if level in PARENT_LEVELS:
+            await mark_refreshed(PARENT_LEVELS[level], {row[parent_key] for row in rows})
+
+        return result
+
+    return save_rows
+
+
+def counts_loader(level: str, snapshot: CatalogSnapshot):
+    async def load_counts(parent_id: int | None) -> dict[str, int]:
+        async with get_db() as session:
+            # Пока версия не создана, она совпадает с опубликованной
+            catalog_repo = CatalogRepository(session, snapshot.ready)
+            return await catalog_repo.get_counts(level, parent_id)
+
+    return load_counts
+
+
+def catalog_levels(snapshot: CatalogSnapshot) -> list[CrawlLevel]:
+    return [
+        CrawlLevel('brands', parse_brands, rows_saver('brands', snapshot), 1, counts_loader('brands', snapshot)),
+        CrawlLevel('models', parse_models, rows_saver('models', snapshot), settings.CRAWL_CONCURRENCY_MODELS, counts_loader('models', snapshot)),
+        CrawlLevel('generations', parse_generations, rows_saver('generations', snapshot), settings.CRAWL_CONCURRENCY_GENERATIONS, counts_loader('generations', snapshot)),
+        CrawlLevel('modifications', parse_modifications, rows_saver('modifications', snapshot), settings.CRAWL_CONCURRENCY_MODIFICATIONS, counts_loader('modifications', snapshot)),
+        CrawlLevel('configurations', parse_configurations, rows_saver('configurations', snapshot), settings.CRAWL_CONCURRENCY_CONFIGURATIONS)
+    ]
+
+
+async def refresh_branch(level: str, node_id: int) -> None:
+    """Обновляет детей одного узла каталога прямо в опубликованных таблицах"""
+
+    child_level = CHILD_LEVELS[level]
+
+    async with get_db() as session:
+        catalog_repo = CatalogRepository(session)
+        action = await catalog_repo.get_action(level, node_id)
+
+    if action is None:
+        return
+
+    started_at = time.perf_counter()
+
+    async with AsyncHTTPClient('https://example', priority=Priority.BACKGROUND, upstream='encar') as client:
+        crawler = CatalogCrawler(client)
+        await crawler.crawl_node(
+            CrawlLevel(child_level, PARSERS[child_level], rows_saver(child_level)),
+            node_id,
+            action
+        )
+
+    logger.info(f'Обновлена ветка каталога {level} ({node_id}) за {time.perf_counter() - started_at:.2f} сек.: {crawler.written}')
+
+
+async def _refresh_branch_once(level: str, node_id: int) -> None:
+    lock_key = f'catalog:refresh:{level}:{node_id}'
+
+    try:
+        # Блокировка в Redis не дает нескольким процессам бота обновлять одну ветку одновременно
+        if await redis_client.set(lock_key, 1, nx=True, ex=settings.CATALOG_REFRESH_LOCK_SECONDS):
+            await refresh_branch(level, node_id)
+    except Exception as e:
+        logger.error(f'Ошибка обновления ветки каталога {level} ({node_id}): {str(e)}')
+    finally:
+        _refresh_tasks.pop((level, node_id), None)
+
+
+async def refresh_if_stale(session: AsyncSession, level: str, node_id: int) -> None:
+    """
+    Если дети узла давно не обновлялись, запускает их обновление в фоне (один раз на все запросы)
+    и сразу возвращает управление - пользователь получает текущие данные
+    """
+
+    if (level, node_id) in _refresh_tasks or circuit_breakers.get('encar').is_open:
+        return
+
+    try:
+        refreshed_at = await get_refreshed_at(level, node_id)
+
+        if refreshed_at and time.time() - refreshed_at < settings.CATALOG_STALE_HOURS * 3600:
+            return
+
+        is_crawling = await CrawlFrontier(redis_client).is_locked()
+    except Exception as e:
+        # Без Redis ветка не обновляется - пользователь получает текущие (возможно, устаревшие) данные
+        logger.error(f'Ошибка проверки актуальности ветки каталога {level} ({node_id}): {str(e)}')
+        return
+
+    # Пока обход собирает новую версию каталога, запись в опубликованные таблицы потеряется при публикации,
+    # а id из общей последовательности разойдутся между версиями - ветку обновит сам обход
+    if is_crawling or await CatalogRepository(session).snapshot_exists():
+        return
+
+    _refresh_tasks[(level, node_id)] = asyncio.create_task(_refresh_branch_once(level, node_id))
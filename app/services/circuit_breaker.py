@@ -0,0 +1,123 @@
+import time
+import asyncio
+
+from bot import bot
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+STATE_TITLES = {
+    CLOSED: '🟢 восстановлен',
+    OPEN: '🔴 недоступен',
+    HALF_OPEN: '🟡 проверка восстановления'
+}
+
+# Настройки размыкателя по источнику: (число ошибок подряд до размыкания, секунд до пробного запроса)
+UPSTREAMS = {
+    'encar': (settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RECOVERY_SECONDS),
+    'currency': (3, 600)
+}
+
+# Статусы, означающие недоступность источника или требование повторной авторизации
+FAILURE_STATUSES = frozenset({401, 403, 408, 429, 500, 502, 503, 504})
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи для одного источника. После failure_threshold неудачных вызовов подряд
+    запросы не отправляются recovery_timeout секунд, затем пропускается один пробный запрос:
+    успех замыкает цепь, ошибка снова размыкает
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN and time.monotonic() - self.opened_at < self.recovery_timeout
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN:
+            if self.is_open:
+                return False
+            self._set_state(HALF_OPEN)
+
+        if self.probe_in_flight:
+            return False
+
+        self.probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.probe_in_flight = False
+
+        if self.state != CLOSED:
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probe_in_flight = False
+
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        previous_state, self.state = self.state, state
+        logger.warning(f'Источник {self.name}: {STATE_TITLES[state]} (ошибок подряд: {self.failures})')
+
+        # В чат логов - только отказ и восстановление, без каждой неудачной пробы
+        if state == CLOSED or previous_state == CLOSED:
+            notify(f'<b>Источник {self.name}: {STATE_TITLES[state]}</b>\nОшибок подряд: {self.failures}')
+
+
+_notify_tasks: set[asyncio.Task] = set()
+
+
+async def _send_notification(text: str) -> None:
+    try:
+        await bot.send_message(settings.LOG_CHAT_ID, text)
+    except Exception as e:
+        logger.error(f'Ошибка отправки уведомления о состоянии источника: {str(e)}')
+
+
+def notify(text: str) -> None:
+    task = asyncio.create_task(_send_notification(text))
+    _notify_tasks.add(task)
+    task.add_done_callback(_notify_tasks.discard)
+
+
+class CircuitBreakerRegistry:
+    def __init__(self):
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self.breakers.get(name)
+
+        if breaker is None:
+            failure_threshold, recovery_timeout = UPSTREAMS.get(
+                name,
+                (settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RECOVERY_SECONDS)
+            )
+            breaker = CircuitBreaker(name, failure_threshold, recovery_timeout)
+            self.breakers[name] = breaker
+
+        return breaker
+
+
+circuit_breakers = CircuitBreakerRegistry()
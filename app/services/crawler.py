@@ -0,0 +1,280 @@
+import json
+import time
+import asyncio
+from typing import Awaitable, Callable
+
+from redis.asyncio import Redis
+
+from utils.logger import setup_logger
+from utils.exceptions import APIError
+from services.utils import AsyncHTTPClient, HTTPMetrics
+
+logger = setup_logger(__name__)
+
+# Снятие и продление блокировки обхода только ее владельцем (по токену)
+RELEASE_LOCK_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+EXTEND_LOCK_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('expire', KEYS[1], ARGV[2]) end return 0"
+
+
+class CrawlFormatError(APIError):
+    """Ответ encar не разбирается: повтор того же запроса не поможет"""
+
+
+class CrawlLevel:
+    def __init__(
+            self,
+            name: str,
+            parse: Callable[[dict, int | None], list[dict]],
+            save: Callable[[list[dict]], Awaitable[tuple[list[tuple], dict[str, int]]]],
+            concurrency: int = 1,
+            load_counts: Callable[[int | None], Awaitable[dict[str, int]]] | None = None
+    ):
+        self.name = name
+        self.parse = parse
+        self.save = save
+        self.concurrency = concurrency
+        self.load_counts = load_counts
+
+
+class CrawlFrontier:
+    """
+    Незавершенные узлы обхода каталога, сохраненные в Redis, чтобы продолжить обход после рестарта или ошибок.
+    Узел, упавший max_attempts раз подряд или с неразбираемым ответом, откладывается (parked) и больше не повторяется
+    """
+
+    def __init__(self, redis: Redis, prefix: str = 'crawl', max_attempts: int = 3):
+        self.redis = redis
+        self.max_attempts = max_attempts
+        self.pending_key = f'{prefix}:frontier'
+        self.failed_key = f'{prefix}:failed'
+        self.parked_key = f'{prefix}:parked'
+        self.state_key = f'{prefix}:state'
+        self.lock_key = f'{prefix}:lock'
+
+    @staticmethod
+    def _field(level: str, parent_id: int | None) -> str:
+        return json.dumps([level, parent_id])
+
+    async def acquire_lock(self, token: str, ttl: int) -> bool:
+        """Блокировка обхода на все процессы бота: таблицы *_next и ключи обхода общие"""
+        return bool(await self.redis.set(self.lock_key, token, nx=True, ex=ttl))
+
+    async def extend_lock(self, token: str, ttl: int) -> bool:
+        return bool(await self.redis.eval(EXTEND_LOCK_SCRIPT, 1, self.lock_key, token, ttl))
+
+    async def release_lock(self, token: str) -> None:
+        await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, self.lock_key, token)
+
+    async def is_locked(self) -> bool:
+        return bool(await self.redis.exists(self.lock_key))
+
+    async def start(self, root_level: str, full: bool) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self.pending_key, self.failed_key, self.parked_key, self.state_key)
+            pipe.hset(self.state_key, mapping={'full': int(full), 'started_at': time.time()})
+            pipe.hset(self.pending_key, self._field(root_level, None), json.dumps([None, False]))
+            await pipe.execute()
+
+    async def has_pending(self) -> bool:
+        return await self.redis.hlen(self.pending_key) > 0
+
+    async def is_resumable(self, max_age: float) -> bool:
+        started_at = await self.redis.hget(self.state_key, 'started_at')
+        return await self.has_pending() and time.time() - float(started_at or 0) < max_age
+
+    async def is_full(self) -> bool:
+        return await self.redis.hget(self.state_key, 'full') == '1'
+
+    async def load(self) -> dict[str, list[tuple]]:
+        seeds = {}
+        for field, value in (await self.redis.hgetall(self.pending_key)).items():
+            level, parent_id = json.loads(field)
+            action, force = json.loads(value)
+            seeds.setdefault(level, []).append((parent_id, action, force))
+        return seeds
+
+    async def mark_saving(self, level: str, parent_id: int | None, action: str | None) -> None:
+        # Если процесс упадет во время записи, счетчики детей уже могут быть обновлены,
+        # поэтому при возобновлении в такой узел спускаемся без сравнения счетчиков
+        await self.redis.hset(self.pending_key, self._field(level, parent_id), json.dumps([action, True]))
+
+    async def complete(self, level: str, parent_id: int | None, child_level: str | None, children: list[tuple]) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if child_level is not None and children:
+                pipe.hset(
+                    self.pending_key,
+                    mapping={self._field(child_level, child_id): json.dumps([child_action, False]) for child_id, child_action in children}
+                )
+            pipe.hdel(self.pending_key, self._field(level, parent_id))
+            pipe.hdel(self.failed_key, self._field(level, parent_id))
+            await pipe.execute()
+
+    async def fail(self, level: str, parent_id: int | None, error: str, terminal: bool = False) -> bool:
+        """Учитывает неудачную попытку узла; возвращает True, если узел отложен и больше не повторяется"""
+
+        field = self._field(level, parent_id)
+        previous = await self.redis.hget(self.failed_key, field)
+        attempts = (json.loads(previous)[0] if previous else 0) + 1
+
+        if not terminal and attempts < self.max_attempts:
+            await self.redis.hset(self.failed_key, field, json.dumps([attempts, error]))
+            return False
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hdel(self.pending_key, field)
+            pipe.hdel(self.failed_key, field)
+            pipe.hset(self.parked_key, field, json.dumps([attempts, error]))
+            await pipe.execute()
+
+        return True
+
+    async def failed_count(self) -> int:
+        return await self.redis.hlen(self.failed_key)
+
+    async def parked(self) -> dict[str, tuple[int, str]]:
+        return {field: tuple(json.loads(value)) for field, value in (await self.redis.hgetall(self.parked_key)).items()}
+
+    async def finish(self) -> None:
+        await self.redis.delete(self.pending_key, self.failed_key, self.parked_key, self.state_key)
+
+
+class CatalogCrawler:
+    def __init__(self, client: AsyncHTTPClient, db_concurrency: int = 4, full: bool = True, frontier: CrawlFrontier | None = None):
+        self.client = client
+        self.full = full
+        self.frontier = frontier
+        self.timings: dict[str, float] = {}
+        self.http: dict[str, HTTPMetrics] = {}
+        self.skipped: dict[str, int] = {}
+        self.failed: dict[str, int] = {}
+        self.written: dict[str, dict[str, int]] = {}
+        self._db_semaphore = asyncio.Semaphore(db_concurrency)
+        self._started_at: dict[str, float] = {}
+
+    async def fetch(self, action: str | None, metrics: HTTPMetrics | None = None) -> dict | None:
+        return await self.client.get(
+            endpoint='/endpoint',
+            params={
+                'param': 'example',
+            },
+            metrics=metrics
+        )
+
+    async def crawl_node(self, level: CrawlLevel, parent_id: int | None, action: str | None, force: bool = False) -> list[tuple]:
+        """Загружает один узел каталога, сохраняет его детей и возвращает (id, action) тех, в которые нужно спуститься"""
+
+        metrics = self.http.setdefault(level.name, HTTPMetrics())
+        data = await self.fetch(action, metrics)
+        if not data:
+            raise APIError('Пустой ответ encar')
+
+        # Разбор уже декодированного ответа - обход нескольких фасет за микросекунды,
+        # передача словаря в процесс-воркер обошлась бы дороже самого разбора
+        try:
+            rows = level.parse(data, parent_id)
+        except (KeyError, IndexError, TypeError) as e:
+            raise CrawlFormatError(f'Неожиданный формат ответа: {str(e)}')
+
+        if not rows:
+            return []
+
+        async with self._db_semaphore:
+            stored_counts = None
+            if not self.full and not force and level.load_counts is not None:
+                stored_counts = await level.load_counts(parent_id)
+
+            if self.frontier is not None:
+                await self.frontier.mark_saving(level.name, parent_id, action)
+
+            saved, written = await level.save(rows)
+
+        level_written = self.written.setdefault(level.name, {})
+        for key, value in written.items():
+            level_written[key] = level_written.get(key, 0) + value
+
+        if stored_counts is None:
+            return [(child_id, child_action) for child_id, child_action, _ in saved]
+
+        # Count фасета - число объявлений в поддереве: если он не изменился, поддерево не трогаем
+        changed_codes = {row['code'] for row in rows if stored_counts.get(row['code']) != row['count']}
+        children = [(child_id, child_action) for child_id, child_action, code in saved if code in changed_codes]
+        self.skipped[level.name] = self.skipped.get(level.name, 0) + len(saved) - len(children)
+
+        return children
+
+    def summary(self) -> dict[str, dict]:
+        """Телеметрия обхода по уровням: длительность, запросы, байты, повторы, ошибки и записанные строки"""
+
+        return {
+            level: {
+                'duration': round(self.timings.get(level, 0), 2),
+                **metrics.as_dict(),
+                'failed': self.failed.get(level, 0),
+                'skipped': self.skipped.get(level, 0),
+                **self.written.get(level, {})
+            }
+            for level, metrics in self.http.items()
+        }
+
+    async def _worker(self, level: CrawlLevel, next_level: CrawlLevel | None, queue: asyncio.Queue, next_queue: asyncio.Queue | None):
+        while True:
+            parent_id, action, force = await queue.get()
+            self._started_at.setdefault(level.name, time.perf_counter())
+
+            try:
+                children = await self.crawl_node(level, parent_id, action, force)
+
+                if next_level is None:
+                    children = []
+
+                if self.frontier is not None:
+                    await self.frontier.complete(level.name, parent_id, next_level.name if next_level else None, children)
+
+                for child_id, child_action in children:
+                    next_queue.put_nowait((child_id, child_action, False))
+            except Exception as e:
+                self.failed[level.name] = self.failed.get(level.name, 0) + 1
+                logger.error(f'Ошибка обхода уровня {level.name} для ({parent_id}): {str(e)}')
+
+                if self.frontier is not None:
+                    try:
+                        if await self.frontier.fail(level.name, parent_id, str(e), isinstance(e, CrawlFormatError)):
+                            logger.error(f'Узел {level.name} ({parent_id}) отложен и больше не повторяется')
+                    except Exception as frontier_error:
+                        logger.error(f'Ошибка сохранения состояния обхода: {str(frontier_error)}')
+            finally:
+                self.timings[level.name] = time.perf_counter() - self._started_at[level.name]
+                queue.task_done()
+
+    async def run(self, levels: list[CrawlLevel], seeds: dict[str, list[tuple]]):
+        """
+        Потоковый обход дерева каталога: каждый уровень обслуживается своим пулом воркеров,
+        и дети узла ставятся в очередь следующего уровня сразу после сохранения узла.
+        seeds - начальные узлы (parent_id, action, force) по имени уровня
+        """
+
+        queues = [asyncio.Queue() for _ in levels]
+        for level, queue in zip(levels, queues):
+            for seed in seeds.get(level.name, []):
+                queue.put_nowait(seed)
+
+        workers = []
+        for idx, level in enumerate(levels):
+            next_level = levels[idx + 1] if idx + 1 < len(levels) else None
+            next_queue = queues[idx + 1] if next_level else None
+            for _ in range(level.concurrency):
+                workers.append(asyncio.create_task(self._worker(level, next_level, queues[idx], next_queue)))
+
+        started_at = time.perf_counter()
+        try:
+            # Родитель ставит детей в очередь до task_done(), поэтому после join() уровня
+            # все узлы следующего уровня уже находятся в его очереди
+            for level, queue in zip(levels, queues):
+                await queue.join()
+                logger.info(f'Уровень {level.name} завершен: {self.timings.get(level.name, 0):.2f} сек.')
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        self.timings['total'] = time.perf_counter() - started_at
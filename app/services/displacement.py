@@ -0,0 +1,97 @@
+from collections import Counter
+
+from redis.asyncio import Redis
+
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class DisplacementIndex:
+    """
+    Объем двигателя по конфигурации каталога, выученный по разобранным страницам автомобилей.
+    Для каждой конфигурации хранится объем каждого увиденного авто (повторный разбор того же авто не искажает счет).
+    Индексу доверяем, если авто достаточно и почти все с одним объемом.
+    Объем конкретного авто берется в первую очередь - одинаково для списка и карточки.
+    Конфигурация, по которой давно ничего не выучено, забывается через DISPLACEMENT_TTL_DAYS
+    """
+
+    def __init__(self, redis: Redis, prefix: str = 'displacement'):
+        self.redis = redis
+        self.prefix = prefix
+        self.stats_key = f'{prefix}:stats'
+
+    async def learn(self, configuration_id: int, car_id: int | str, displacement: int | None) -> None:
+        if not displacement:
+            return
+
+        key = f'{self.prefix}:{configuration_id}'
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, str(car_id), displacement)
+                pipe.expire(key, settings.DISPLACEMENT_TTL_DAYS * 86400)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f'Ошибка записи индекса объема двигателя: {str(e)}')
+
+    async def get_confident(self, configuration_id: int) -> int | None:
+        """Объем двигателя, если индекс по конфигурации уверен, иначе None"""
+
+        try:
+            values = await self.redis.hvals(f'{self.prefix}:{configuration_id}')
+        except Exception as e:
+            logger.error(f'Ошибка чтения индекса объема двигателя: {str(e)}')
+            return None
+
+        return self._confident(values)
+
+    async def get(self, configuration_id: int, car_id: int | str) -> int | None:
+        return (await self.get_many(configuration_id, [car_id]))[0]
+
+    async def get_many(self, configuration_id: int, car_ids: list[int | str]) -> list[int | None]:
+        """
+        Объемы двигателя для страницы авто одним запросом: выученный объем самого авто,
+        иначе уверенный объем конфигурации, иначе None
+        """
+
+        try:
+            learned = await self.redis.hgetall(f'{self.prefix}:{configuration_id}')
+        except Exception as e:
+            logger.error(f'Ошибка чтения индекса объема двигателя: {str(e)}')
+            return [None] * len(car_ids)
+
+        confident = self._confident(list(learned.values()))
+
+        return [int(learned[str(car_id)]) if str(car_id) in learned else confident for car_id in car_ids]
+
+    @staticmethod
+    def _confident(values: list) -> int | None:
+        if len(values) < settings.DISPLACEMENT_MIN_SAMPLES:
+            return None
+
+        displacement, count = Counter(values).most_common(1)[0]
+        if count / len(values) < settings.DISPLACEMENT_CONFIDENCE:
+            return None
+
+        return int(displacement)
+
+    async def count(self, hit: bool) -> None:
+        try:
+            await self.redis.hincrby(self.stats_key, 'hits' if hit else 'misses', 1)
+        except Exception as e:
+            logger.error(f'Ошибка записи статистики индекса объема двигателя: {str(e)}')
+
+    async def stats(self, reset: bool = False) -> dict[str, float]:
+        raw = await self.redis.hgetall(self.stats_key)
+        if reset:
+            await self.redis.delete(self.stats_key)
+
+        hits, misses = int(raw.get('hits', 0)), int(raw.get('misses', 0))
+
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0
+        }
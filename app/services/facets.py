@@ -0,0 +1,53 @@
+from typing import Callable, Iterator
+
+Predicate = Callable[[dict], bool]
+
+
+def is_selected(facet: dict) -> bool:
+    return facet['IsSelected'] is True
+
+
+def is_year_group(facet: dict) -> bool:
+    return facet['Expression'].startswith('YearGroup.')
+
+
+def is_not_year_group(facet: dict) -> bool:
+    return not is_year_group(facet)
+
+
+def is_selected_not_year_group(facet: dict) -> bool:
+    return bool(facet['IsSelected']) and not is_year_group(facet)
+
+
+class FacetPath:
+    """
+    Путь по дереву фасетов iNav: на каждом уровне берется первая фасета с уточнениями (Refinements),
+    подходящая под условие из branch, и обход продолжается по ним. Фасеты последнего уровня отдаются лениво,
+    если подходят под условие emit
+    """
+
+    def __init__(self, node_name: str, branch: tuple[Predicate, ...], emit: Predicate | None = None):
+        self.node_name = node_name
+        self.branch = branch
+        self.emit = emit
+
+    def extract(self, data: dict) -> Iterator[dict]:
+        facets = None
+        for node in data['iNav']['Nodes']:
+            if node['Name'] == self.node_name:
+                facets = node['Facets']
+                break
+
+        if facets is None:
+            return
+
+        for predicate in self.branch:
+            facet = next((facet for facet in facets if predicate(facet) and facet['Refinements']['Nodes']), None)
+            if facet is None:
+                return
+
+            facets = facet['Refinements']['Nodes'][0]['Facets']
+
+        for facet in facets:
+            if self.emit is None or self.emit(facet):
+                yield facet
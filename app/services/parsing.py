@@ -0,0 +1,129 @@
+import re
+import sys
+import json
+import time
+import asyncio
+from typing import Any, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from config import settings
+from utils.logger import setup_logger
+from services.records import CarDetail
+
+logger = setup_logger(__name__)
+
+# Состояние страницы автомобиля, которое сайт встраивает в <script> как `__PRELOADED_STATE__ = {...}`
+PRELOADED_STATE_MARKER = '__PRELOADED_STATE__'
+
+_assignment = re.compile(r'\s*=\s*')
+_decoder = json.JSONDecoder()
+
+
+def extract_preloaded_state(html: str) -> dict | None:
+    """
+    Быстрый поиск встроенного JSON без построения DOM: находит маркер в тексте страницы
+    и декодирует только объект после `=` (raw_decode останавливается на конце объекта)
+    """
+
+    start = html.find(PRELOADED_STATE_MARKER)
+    if start == -1:
+        return None
+
+    assignment = _assignment.match(html, start + len(PRELOADED_STATE_MARKER))
+    if assignment is None or not assignment.group():
+        return None
+
+    try:
+        state, _ = _decoder.raw_decode(html, assignment.end())
+    except json.JSONDecodeError:
+        return None
+
+    return state if isinstance(state, dict) else None
+
+
+def extract_preloaded_state_soup(html: str) -> dict | None:
+    """Медленный, но терпимый к разметке разбор через BeautifulSoup"""
+
+    soup = BeautifulSoup(html, 'html.parser')
+    script_tag = soup.find('script', string=lambda text: PRELOADED_STATE_MARKER in str(text))
+
+    if script_tag:
+        script_content = script_tag.string.split(PRELOADED_STATE_MARKER, 1)[1]
+        script_content = _assignment.sub('', script_content, count=1).strip().rstrip(';')
+        return json.loads(script_content)
+
+
+def parse_car_info_html(html: str) -> dict | None:
+    car_info = extract_preloaded_state(html)
+
+    if car_info is None:
+        car_info = extract_preloaded_state_soup(html)
+        if car_info is not None:
+            logger.warning('Быстрый разбор страницы автомобиля не сработал, использован BeautifulSoup - проверьте разметку')
+
+    return car_info
+
+
+def parse_car_detail(html: str) -> list | None:
+    """Разбор страницы автомобиля сразу в компактную запись (список значений CarDetail)"""
+
+    car_info = parse_car_info_html(html)
+    if car_info is not None:
+        return CarDetail.from_api(car_info).to_list()
+
+
+class ParsingExecutor:
+    """
+    Вынос тяжелого разбора HTML/JSON из event loop. Режим задается PARSING_EXECUTOR:
+    process - пул процессов, thread - пул потоков (имеет смысл на сборках без GIL), inline - в event loop.
+    Число задач в очереди ограничено: при заполнении вызывающий ждет, а не копит работу в памяти
+    """
+
+    def __init__(self):
+        self.executor: Executor | None = None
+        self.semaphore: asyncio.Semaphore | None = None
+
+    def start(self) -> None:
+        mode = settings.PARSING_EXECUTOR
+        if mode == 'auto':
+            gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+            mode = 'process' if gil_enabled else 'thread'
+
+        if mode == 'process':
+            self.executor = ProcessPoolExecutor(max_workers=settings.PARSING_WORKERS)
+        elif mode == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=settings.PARSING_WORKERS, thread_name_prefix='parsing')
+
+        self.semaphore = asyncio.Semaphore(settings.PARSING_MAX_PENDING)
+        logger.info(f'Разбор страниц: {mode}, воркеров: {settings.PARSING_WORKERS}')
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.executor is None:
+            return func(*args)
+
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+
+parsing_executor = ParsingExecutor()
+
+
+async def monitor_loop_lag(interval: float = 1.0) -> None:
+    """Замер задержки event loop: насколько позже запланированного просыпается sleep"""
+
+    target = settings.LOOP_LAG_TARGET_MS / 1000
+
+    while True:
+        started_at = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = time.perf_counter() - started_at - interval
+
+        if lag > target:
+            logger.warning(f'Задержка event loop {lag * 1000:.0f} мс (цель {settings.LOOP_LAG_TARGET_MS} мс)')
@@ -0,0 +1,112 @@
+import time
+import asyncio
+from enum import IntEnum
+from collections import deque
+from urllib.parse import urlsplit
+
+from config import settings
+
+
+class Priority(IntEnum):
+    """Полосы ограничителя: запросы пользователей обслуживаются раньше фоновых задач"""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class TokenBucket:
+    """
+    Ограничитель запросов к одному хосту (token bucket) с полосами приоритета.
+    Фоновые запросы берут токен, только если после этого в ведре остается резерв для пользователей.
+    Скорость подстраивается под хост: при 429/503 падает вдвое, при успешных ответах растет до max_rate
+    """
+
+    def __init__(self, max_rate: float, burst: int, reserve: int, min_rate: float):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate = max_rate
+        self.burst = burst
+        self.reserve = min(reserve, burst - 1)
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.waiters: dict[Priority, deque[asyncio.Future]] = {priority: deque() for priority in Priority}
+        self._timer: asyncio.TimerHandle | None = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _threshold(self, priority: Priority) -> float:
+        return 1 if priority == Priority.INTERACTIVE else 1 + self.reserve
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        self._refill()
+
+        for priority in Priority:
+            waiters = self.waiters[priority]
+
+            while waiters and waiters[0].done():
+                waiters.popleft()
+
+            while waiters and self.tokens >= self._threshold(priority):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self.tokens -= 1
+                    waiter.set_result(None)
+
+            # Пока ждет более приоритетная полоса, младшие не обслуживаются
+            if waiters:
+                break
+
+        pending = next((priority for priority in Priority if self.waiters[priority]), None)
+        if pending is not None:
+            delay = (self._threshold(pending) - self.tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(max(delay, 0), self._dispatch)
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters[priority].append(waiter)
+
+        # Таймер мог быть рассчитан на фоновую полосу - пересчитываем с учетом нового запроса
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Токен уже выдан, но запрос отменен - возвращаем токен в ведро
+            if waiter.done() and not waiter.cancelled():
+                self.tokens = min(self.burst, self.tokens + 1)
+            raise
+
+    def throttle(self) -> None:
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class RateLimiterRegistry:
+    def __init__(self):
+        self.buckets: dict[str, TokenBucket] = {}
+
+    def get(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        bucket = self.buckets.get(host)
+
+        if bucket is None:
+            bucket = TokenBucket(
+                max_rate=settings.HTTP_RATE_LIMIT,
+                burst=settings.HTTP_RATE_BURST,
+                reserve=settings.HTTP_RATE_INTERACTIVE_RESERVE,
+                min_rate=settings.HTTP_RATE_MIN
+            )
+            self.buckets[host] = bucket
+
+        return bucket
+
+
+rate_limiters = RateLimiterRegistry()
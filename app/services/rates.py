@@ -0,0 +1,77 @@
+import asyncio
+
+from redis.asyncio import Redis
+
+from bot import redis_client
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RatesStore:
+    """
+    Курсы KRW и EUR, общие для всех процессов бота: лежат в Redis вместе с версией,
+    которая растет при каждом изменении курса. Чтение идет из локальной копии,
+    ее обновляет подписка на канал изменений (и перечитывание при переподключении)
+    """
+
+    def __init__(self, redis: Redis, key: str = 'rates', channel: str = 'rates:updates'):
+        self.redis = redis
+        self.key = key
+        self.channel = channel
+
+        # До первой загрузки - курсы из настроек
+        self.krw = settings.KRW_RATE
+        self.eur = settings.EUR_RATE
+        self.version = 0
+
+    async def load(self) -> None:
+        try:
+            raw = await self.redis.hgetall(self.key)
+        except Exception as e:
+            logger.error(f'Ошибка чтения курсов валют: {str(e)}')
+            return
+
+        if raw and int(raw['version']) > self.version:
+            self.krw = float(raw['krw'])
+            self.eur = float(raw['eur'])
+            self.version = int(raw['version'])
+
+    async def publish(self, krw: float, eur: float) -> int:
+        """Сохраняет курсы и оповещает процессы; версия увеличивается, только если курс изменился"""
+
+        await self.load()
+        if self.version and (krw, eur) == (self.krw, self.eur):
+            return self.version
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.key, mapping={'krw': krw, 'eur': eur})
+            pipe.hincrby(self.key, 'version', 1)
+            _, version = await pipe.execute()
+
+        await self.redis.publish(self.channel, version)
+        self.krw, self.eur, self.version = krw, eur, version
+
+        return version
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Изменения, пропущенные без подписки, подтягиваются сразу
+                    await self.load()
+
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message' and int(message['data']) > self.version:
+                            await self.load()
+                            logger.info(f'Курсы валют обновлены до версии {self.version}: KRW {self.krw}, EUR {self.eur}')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'Ошибка подписки на изменения курсов валют: {str(e)}')
+                await asyncio.sleep(5)
+
+
+rates = RatesStore(redis_client)
@@ -0,0 +1,105 @@
+from typing import Any
+
+
+class Record:
+    """
+    Компактная запись ответа encar: только используемые поля в __slots__.
+    В FSM и кэшах хранится списком значений (to_list), а не исходным словарем API
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values: Any):
+        for field, value in zip(self.__slots__, values, strict=True):
+            setattr(self, field, value)
+
+    def to_list(self) -> list:
+        return [getattr(self, field) for field in self.__slots__]
+
+    @classmethod
+    def from_list(cls, values: list):
+        return cls(*values)
+
+
+class SearchCar(Record):
+    """Элемент SearchResults из поиска"""
+
+    __slots__ = ('id', 'manufacturer', 'model', 'grade', 'year_month', 'form_year', 'mileage', 'fuel_type', 'price', 'photos')
+
+    id: int
+    manufacturer: str
+    model: str
+    grade: str
+    year_month: int
+    form_year: str
+    mileage: int
+    fuel_type: str
+    price: float
+    photos: list[str]
+
+    @classmethod
+    def from_api(cls, item: dict) -> 'SearchCar':
+        return cls(
+            int(item['Id']),
+            item['Manufacturer'],
+            item['Model'],
+            item['Badge'],
+            int(item['Year']),
+            item['FormYear'],
+            int(item['Mileage']),
+            item['FuelType'],
+            item['Price'],
+            [photo['location'] for photo in (item.get('Photos') or [])[:10]]
+        )
+
+    def to_detail(self, displacement: int | None) -> 'CarDetail':
+        """Карточка без загрузки страницы: объем двигателя известен из индекса"""
+
+        return CarDetail(
+            self.id,
+            self.manufacturer,
+            self.model,
+            self.grade,
+            self.year_month,
+            self.mileage,
+            self.fuel_type,
+            self.price,
+            displacement,
+            self.photos
+        )
+
+
+class CarDetail(Record):
+    """Страница автомобиля (встроенное состояние страницы)"""
+
+    __slots__ = ('id', 'manufacturer', 'model', 'grade', 'year_month', 'mileage', 'fuel_type', 'price', 'displacement', 'photos')
+
+    id: int
+    manufacturer: str
+    model: str
+    grade: str
+    year_month: int
+    mileage: int
+    fuel_type: str
+    price: float
+    displacement: int | None
+    photos: list[str]
+
+    @classmethod
+    def from_api(cls, car_info: dict) -> 'CarDetail':
+        base = car_info['cars']['base']
+        category = base['category']
+        spec = base['spec']
+
+        return cls(
+            base['queryCarId'],
+            category['manufacturerEnglishName'],
+            category['modelName'],
+            category['gradeEnglishName'],
+            int(category['yearMonth']),
+            spec['mileage'],
+            spec['fuelName'],
+            base['advertisement']['price'],
+            spec['displacement'],
+            [photo['path'] for photo in base['photos'] or [] if photo['type'] == 'OUTER']
+        )
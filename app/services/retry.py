@@ -0,0 +1,69 @@
+import random
+from datetime import datetime, UTC
+from email.utils import parsedate_to_datetime
+
+from config import settings
+
+
+class RetryPolicy:
+    """
+    Политика повторов запроса: число попыток, экспоненциальная задержка с jitter,
+    общий дедлайн вызова и статусы, при которых повтор безопасен
+    """
+
+    def __init__(
+            self,
+            attempts: int = 3,
+            base_delay: float = 0.5,
+            max_delay: float = 10,
+            deadline: float = 30,
+            retry_statuses: frozenset[int] = frozenset({408, 429, 500, 502, 503, 504})
+    ):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = retry_statuses
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        # Full jitter: одновременно упавшие запросы не повторяются синхронно
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        return delay
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After бывает числом секунд или HTTP-датой"""
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(UTC)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+# Пользователь ждет ответа - немного быстрых попыток
+INTERACTIVE_RETRY = RetryPolicy(
+    attempts=settings.HTTP_RETRY_ATTEMPTS,
+    max_delay=5,
+    deadline=settings.HTTP_RETRY_DEADLINE
+)
+
+# Фоновые задачи могут подождать восстановления источника дольше
+BACKGROUND_RETRY = RetryPolicy(
+    attempts=settings.HTTP_RETRY_ATTEMPTS_BACKGROUND,
+    max_delay=30,
+    deadline=settings.HTTP_RETRY_DEADLINE_BACKGROUND
+)
+
+NO_RETRY = RetryPolicy(attempts=1)
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных вызовов: пока первый вызов по ключу выполняется,
+    остальные ждут его результат вместо повторного запроса. Вызов отменяется, когда отменены все ожидающие
+    """
+
+    def __init__(self):
+        self.calls: dict[Hashable, asyncio.Task] = {}
+        self.waiters: dict[Hashable, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.calls.get(key)
+
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(func())
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+        else:
+            self.hits += 1
+
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        try:
+            # shield: отмена одного ожидающего (например, пользователь ушел) не отменяет запрос для остальных
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self.waiters[key] == 1 and self.calls.get(key) is task:
+                task.cancel()
+            raise
+        finally:
+            self.waiters[key] -= 1
+            if not self.waiters[key]:
+                del self.waiters[key]
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'in_flight': len(self.calls)
+        }
@@ -0,0 +1,119 @@
+import os
+import json
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_TARIFFS_PATH = Path(__file__).resolve().parent.parent / 'tariffs.json'
+
+
+class TariffTables:
+    """
+    Таможенные тарифы из версионированной таблицы. Ставка находится бинарным поиском по границам диапазонов:
+    bisect_right - для диапазонов вида [от, до), bisect_left - для диапазонов с включенной верхней границей
+    """
+
+    def __init__(self, tables: dict):
+        self.version = tables['version']
+
+        recycling = tables['recycling_fee']
+        self.recycling_base = recycling['base']
+        self.recycling_age_bounds = recycling['age_bounds']
+        self.recycling_electro = recycling['electro']
+        self.recycling_volume_bounds = recycling['volume_bounds']
+        self.recycling_coefficients = recycling['coefficients']
+
+        duty = tables['custom_duty']
+        self.duty_age_bounds = duty['age_bounds']
+        self.duty_new_price_bounds = duty['new']['price_bounds_eur']
+        self.duty_new_per_cc = duty['new']['per_cc_eur']
+        self.duty_new_price_share = duty['new']['price_share']
+        self.duty_volume_bounds = duty['volume_bounds']
+        self.duty_per_cc = duty['per_cc_eur']
+
+        clearance = tables['custom_clearance']
+        self.clearance_price_bounds = clearance['price_bounds']
+        self.clearance_fees = clearance['fees']
+
+        self._validate()
+
+    def _validate(self) -> None:
+        brackets = [
+            *((self.recycling_volume_bounds, row) for row in self.recycling_coefficients),
+            (self.duty_new_price_bounds, self.duty_new_per_cc),
+            (self.duty_new_price_bounds, self.duty_new_price_share),
+            *((self.duty_volume_bounds, row) for row in self.duty_per_cc),
+            (self.clearance_price_bounds, self.clearance_fees)
+        ]
+
+        for bounds, values in brackets:
+            if bounds != sorted(bounds) or len(values) != len(bounds) + 1:
+                raise ValueError(f'Некорректная таблица тарифов {self.version}: границы {bounds}')
+
+        if len(self.recycling_coefficients) != len(self.recycling_age_bounds) + 1:
+            raise ValueError(f'Некорректная таблица тарифов {self.version}: возрастные группы утильсбора')
+        if len(self.duty_per_cc) != len(self.duty_age_bounds):
+            raise ValueError(f'Некорректная таблица тарифов {self.version}: возрастные группы пошлины')
+
+    def recycling_fee(self, car_age: int, engine_volume: int, is_electro: bool) -> int:
+        age_group = bisect_right(self.recycling_age_bounds, car_age)
+
+        if is_electro:
+            coefficient = self.recycling_electro[age_group]
+        else:
+            coefficient = self.recycling_coefficients[age_group][bisect_right(self.recycling_volume_bounds, engine_volume)]
+
+        return int(self.recycling_base * coefficient)
+
+    def custom_duty(self, car_age: int, car_price: int, engine_volume: int, eur_rate: float) -> int:
+        age_group = bisect_right(self.duty_age_bounds, car_age)
+
+        if age_group == 0:
+            # Новые авто: процент от стоимости, но не меньше ставки за см3
+            bracket = bisect_right(self.duty_new_price_bounds, car_price / eur_rate)
+            by_price = car_price * self.duty_new_price_share[bracket]
+            by_volume = engine_volume * self.duty_new_per_cc[bracket] * eur_rate
+
+            return int(by_price) if by_price > by_volume else int(by_volume)
+
+        per_cc = self.duty_per_cc[age_group - 1][bisect_right(self.duty_volume_bounds, engine_volume)]
+        return int(engine_volume * per_cc * eur_rate)
+
+    def custom_clearance(self, car_price: int) -> int:
+        return self.clearance_fees[bisect_left(self.clearance_price_bounds, car_price)]
+
+
+class TariffStore:
+    """Текущая таблица тарифов с перечитыванием файла при изменении, без перезапуска бота"""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self.mtime: float | None = None
+        self.tables = self._load()
+
+    def _load(self) -> TariffTables:
+        self.mtime = self.path.stat().st_mtime
+        with open(self.path, encoding='utf-8') as file:
+            return TariffTables(json.load(file))
+
+    def reload_if_changed(self) -> bool:
+        if self.path.stat().st_mtime == self.mtime:
+            return False
+
+        previous_version = self.tables.version
+        try:
+            self.tables = self._load()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Битая таблица не должна ломать расчеты - остаемся на прежней версии
+            logger.error(f'Ошибка загрузки таблицы тарифов, остается версия {previous_version}: {str(e)}')
+            return False
+
+        logger.info(f'Таблица тарифов обновлена: {previous_version} -> {self.tables.version}')
+        return True
+
+
+tariffs = TariffStore(settings.TARIFFS_PATH or DEFAULT_TARIFFS_PATH)
@@ -2,18 +2,100 @@ import asyncio
 import logging
 import traceback
 
+from urllib.parse import urlsplit, urlencode
+
 import aiohttp
 import aiohttp.client_exceptions
 from aiohttp.client_reqrep import ClientResponse
 
+from config import settings
+from services.rate_limiter import Priority, rate_limiters
+from services.retry import RetryPolicy, INTERACTIVE_RETRY, BACKGROUND_RETRY, parse_retry_after
+from services.circuit_breaker import circuit_breakers, FAILURE_STATUSES
+from services.single_flight import SingleFlight
+
+
+class HTTPMetrics:
+    """Счетчики запросов клиента: число запросов, скачанные байты, повторы и ошибки"""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.retries = 0
+        self.errors = 0
+        self.rejected = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'retries': self.retries,
+            'errors': self.errors,
+            'rejected': self.rejected
+        }
+
+
+class HTTPSessionPool:
+    """
+    Общие на весь процесс сессии aiohttp по базовому URL: соединения переиспользуются между клиентами
+    (keep-alive), DNS кэшируется. Открывается и закрывается в lifespan бота
+    """
+
+    def __init__(self):
+        self.sessions: dict[str, aiohttp.ClientSession] = {}
+        self.is_open = False
+
+    def open(self) -> None:
+        self.is_open = True
+
+    def get(self, base_url: str) -> aiohttp.ClientSession:
+        session = self.sessions.get(base_url)
+
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS
+            )
+            # Куки не накапливаются между клиентами, как и при отдельной сессии на каждый клиент
+            session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+            self.sessions[base_url] = session
+
+        return session
+
+    async def close(self) -> None:
+        self.is_open = False
+
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions.clear()
+
+
+http_sessions = HTTPSessionPool()
+
+
+def request_key(url: str, params: dict = None) -> str:
+    """Ключ GET-запроса: полный URL и все параметры в отсортированном виде"""
+
+    return f'{url}?{urlencode(sorted((params or {}).items()))}'
+
+# Общий на процесс: одинаковые одновременные GET разных клиентов уходят одним запросом
+get_requests = SingleFlight()
+
 
 class AsyncHTTPClient:
-    def __init__(self, base_url: str, headers: dict = None):
+    def __init__(self, base_url: str, headers: dict = None, priority: Priority = Priority.INTERACTIVE, upstream: str = None):
         self.base_url = base_url.rstrip('/')
+        self.priority = priority
+        self.rate_limiter = rate_limiters.get(self.base_url)
+        self.circuit_breaker = circuit_breakers.get(upstream or urlsplit(self.base_url).netloc)
         self.headers = headers or {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 YaBrowser/25.2.0.0 Safari/537.36',
         }
         self.session = None
+        self.is_pooled = False
+        self.metrics = HTTPMetrics()
 
     async def __aenter__(self):
         await self.start_session()
@@ -23,11 +105,17 @@ class AsyncHTTPClient:
         await self.close_session()
 
     async def start_session(self):
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        # Вне запущенного бота (пул закрыт) клиент работает на собственной сессии
+        self.is_pooled = http_sessions.is_open
+        if self.is_pooled:
+            self.session = http_sessions.get(self.base_url)
+        else:
+            self.session = aiohttp.ClientSession(headers=self.headers)
 
     async def close_session(self):
         if self.session:
-            await self.session.close()
+            if not self.is_pooled:
+                await self.session.close()
             self.session = None
 
     async def request(
@@ -37,15 +125,24 @@ class AsyncHTTPClient:
             params: dict = None,
             data: dict = None,
             json: dict = None,
-            headers: dict = None
+            headers: dict = None,
+            metrics: HTTPMetrics = None
     ):
         if not self.session:
             await self.start_session()
 
         url = f'{self.base_url}{endpoint}'
         request_headers = {**self.headers, **(headers or {})}
+        counters = [self.metrics, metrics] if metrics else [self.metrics]
+
+        for counter in counters:
+            counter.requests += 1
+
+        # Сессия берется до ожидания лимитера: клиент могут закрыть, пока объединенный запрос ждет очереди
+        session = self.session
+        await self.rate_limiter.acquire(self.priority)
 
-        async with self.session.request(
+        async with session.request(
             method=method,
             url=url,
             params=params,
@@ -54,20 +151,111 @@ class AsyncHTTPClient:
             headers=request_headers
         ) as response:
             response: ClientResponse
+
+            if response.status in (429, 503):
+                self.rate_limiter.throttle()
+            elif response.ok:
+                self.rate_limiter.recover()
+
             response.raise_for_status()
+
+            body = await response.read()
+            for counter in counters:
+                counter.bytes += len(body)
+
             if response.content_type == 'application/json':
                 return await response.json()
             return await response.text()
 
-    async def get(self, endpoint: str, params: dict = None, headers: dict = None):
-        while True:
-            try:
-                return await self.request('GET', endpoint, params=params, headers=headers)
-            except aiohttp.client_exceptions.ClientResponseError:
-                logging.error(traceback.format_exc())
-                return None
-            except aiohttp.client_exceptions.ConnectionTimeoutError:
-                await asyncio.sleep(1)
+    async def get(
+            self,
+            endpoint: str,
+            params: dict = None,
+            headers: dict = None,
+            metrics: HTTPMetrics = None,
+            retry: RetryPolicy = None
+    ):
+        """
+        GET с повторами по политике retry (по умолчанию - по приоритету клиента).
+        Возвращает None, если ответ так и не был получен или источник отключен размыкателем.
+        Одинаковые одновременные вызовы (URL, параметры, заголовки) получают результат одного запроса.
+        Полоса приоритета и политика повторов входят в ключ: запрос пользователя не должен ждать
+        фоновый запрос с его очередью к лимитеру и длинным дедлайном
+        """
+
+        policy = retry or (BACKGROUND_RETRY if self.priority == Priority.BACKGROUND else INTERACTIVE_RETRY)
+
+        key = (
+            request_key(f'{self.base_url}{endpoint}', params),
+            repr(sorted((headers or {}).items())),
+            self.priority,
+            id(policy)
+        )
+        return await get_requests.do(key, lambda: self._get(endpoint, params, headers, metrics, policy))
+
+    async def _get(
+            self,
+            endpoint: str,
+            params: dict = None,
+            headers: dict = None,
+            metrics: HTTPMetrics = None,
+            policy: RetryPolicy = INTERACTIVE_RETRY
+    ):
+        counters = [self.metrics, metrics] if metrics else [self.metrics]
+
+        if not self.circuit_breaker.allow():
+            for counter in counters:
+                counter.rejected += 1
+            return None
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+
+        error = None
+        upstream_failed = False
+
+        try:
+            for attempt in range(policy.attempts):
+                retry_after = None
+
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        data = await self.request('GET', endpoint, params=params, headers=headers, metrics=metrics)
+                    self.circuit_breaker.record_success()
+                    return data
+                except aiohttp.client_exceptions.ClientResponseError as e:
+                    error = traceback.format_exc()
+                    upstream_failed = e.status in FAILURE_STATUSES
+                    if e.status not in policy.retry_statuses:
+                        break
+                    retry_after = parse_retry_after(e.headers.get('Retry-After') if e.headers else None)
+                except (aiohttp.client_exceptions.ClientConnectionError, asyncio.TimeoutError):
+                    error = traceback.format_exc()
+                    upstream_failed = True
+                    if loop.time() >= deadline:
+                        break
+
+                delay = policy.backoff(attempt, retry_after)
+                if attempt + 1 == policy.attempts or loop.time() + delay >= deadline:
+                    break
+
+                for counter in counters:
+                    counter.retries += 1
+                await asyncio.sleep(delay)
+        except BaseException:
+            # Отмена или непредвиденная ошибка не должны оставить пробный запрос размыкателя висеть
+            self.circuit_breaker.probe_in_flight = False
+            raise
+
+        if upstream_failed:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+        for counter in counters:
+            counter.errors += 1
+        logging.error(error)
+        return None
 
     async def post(self, endpoint: str, data: dict = None, json: dict = None, headers: dict = None):
         return await self.request('POST', endpoint, data=data, json=json, headers=headers)
@@ -7,19 +7,27 @@ from playwright.async_api import async_playwright
 from config import settings
 from utils.logger import setup_logger
 from services.utils import AsyncHTTPClient
+from services.retry import NO_RETRY
+from services.circuit_breaker import circuit_breakers
 
 logger = setup_logger(__name__)
 
 
 async def check_request_encar():
-    async with AsyncHTTPClient('https://example') as client:
+    # Проверка идет мимо размыкателя encar: он мог разомкнуться как раз из-за требования авторизации
+    async with AsyncHTTPClient('https://example', upstream='encar_auth') as client:
         data = await client.get(
             endpoint='/endpoint',
             params={
                 'param': 'example',
-            }
+            },
+            retry=NO_RETRY
         )
-        return data
+
+    if data is not None:
+        circuit_breakers.get('encar').record_success()
+
+    return data
 
 
 async def check_captcha_presence(page):
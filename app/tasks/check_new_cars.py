@@ -5,6 +5,8 @@ import aiogram.exceptions
 from bot import functions, keyboards
 from config import settings
 from utils.logger import setup_logger
+from services.rate_limiter import Priority
+from services.circuit_breaker import circuit_breakers
 from database.base import get_db
 from database.repository.user import UserRepository
 from database.repository.tracking import TrackingRepository
@@ -15,6 +17,10 @@ logger = setup_logger(__name__)
 async def check_new_cars_task():
     logger.info('Запуск задачи проверки о появлений новых машин')
 
+    if circuit_breakers.get('encar').is_open:
+        logger.info('Encar недоступен, проверка новых машин пропущена')
+        return
+
     async with get_db() as session:
         tracking_repo = TrackingRepository(session)
         tracking_list = await tracking_repo.tracking_list_all()
@@ -23,15 +29,20 @@ async def check_new_cars_task():
         if tracking_list:
             for tracking in tracking_list:
                 if tracking.is_active:
-                    car_ids = await functions.parse_cars(session, tracking.id)
+                    car_ids = await functions.parse_cars(session, tracking.id, Priority.BACKGROUND)
                     for car_id in car_ids:
                         if car_id not in tracking.car_ids:
                             try:
-                                car_info = await functions.get_car_info_url(car_id)
+                                car_info = await functions.get_car_info_url(car_id, Priority.BACKGROUND)
+                                if not car_info:
+                                    logger.info(f'Не удалось получить страницу нового автомобиля ({car_id}) по отслеживанию ({tracking.id})')
+                                    continue
+
+                                await functions.displacement_index.learn(tracking.configuration_id, car_id, car_info.displacement)
 
                                 car_age = functions.cal_car_age(
-                                    int(str(car_info['cars']['base']['category']['yearMonth'])[:4]),
-                                    str(car_info['cars']['base']['category']['yearMonth'])[4:]
+                                    int(str(car_info.year_month)[:4]),
+                                    str(car_info.year_month)[4:]
                                 )
 
                                 msg = await functions.show_car_info(
@@ -84,7 +95,7 @@ async def check_new_cars_task():
 
                     await tracking_repo.update_car_ids(tracking.id, list(set(tracking.car_ids + car_ids)))
                 else:
-                    await functions.activate_tracking(session, tracking.id)
+                    await functions.activate_tracking(session, tracking.id, Priority.BACKGROUND)
         else:
             logger.info('Список отслеживаний на данный момент пуст')
 
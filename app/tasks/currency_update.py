@@ -1,8 +1,9 @@
 import json
 
-from config import settings
 from utils.logger import setup_logger
 from services.utils import AsyncHTTPClient
+from services.retry import BACKGROUND_RETRY
+from services.rates import rates
 
 logger = setup_logger(__name__)
 
@@ -11,8 +12,8 @@ async def KRW_updates_task():
     logger.info('Запуск задачи актуализации цен KRW и EUR')
 
     try:
-        async with AsyncHTTPClient('https://example') as client:
-            data = await client.get('/endpoint')
+        async with AsyncHTTPClient('https://example', upstream='currency') as client:
+            data = await client.get('/endpoint', retry=BACKGROUND_RETRY)
             data = json.loads(data)
             KRW = data['Valute']['KRW']
             EUR = data['Valute']['EUR']
@@ -26,9 +27,8 @@ async def KRW_updates_task():
                 f'Цена EUR: {EUR_RATE}'
             )
 
-            settings.KRW_RATE = KRW['Value'] / KRW['Nominal']
-            settings.EUR_RATE = EUR['Value'] / EUR['Nominal']
+            version = await rates.publish(KRW_RATE, EUR_RATE)
 
-            logger.info('Задача по актуализации цен KRW и EUR выполнена успешно')
+            logger.info(f'Задача по актуализации цен KRW и EUR выполнена успешно (версия курсов {version})')
     except Exception as e:
         logger.error(f'Ошибка получения актуальной цены KRW и EUR: {str(e)}')
@@ -1,304 +1,220 @@
-from typing import List, Dict, Any
+import time
+import asyncio
+from uuid import uuid4
+from datetime import datetime, timedelta
 
+import pytz
+
+from bot import bot, redis_client
+from config import settings
 from utils.logger import setup_logger
+from utils.scheduler import scheduler
 from database.base import get_db
-from services.utils import AsyncHTTPClient
-from database.repository.brand import BrandRepository
-from database.repository.model import ModelRepository
-from database.repository.generation import GenerationRepository
-from database.repository.modification import ModificationRepository
-from database.repository.configuration import ConfigurationRepository
+from database.models import CrawlRun
+from services.utils import AsyncHTTPClient, get_requests
+from services.rate_limiter import Priority
+from services.circuit_breaker import circuit_breakers
+from services.crawler import CatalogCrawler, CrawlFrontier
+from services.catalog import catalog_levels, CatalogSnapshot
+from database.repository.catalog import CatalogRepository
+from database.repository.crawl_run import CrawlRunRepository
 
 logger = setup_logger(__name__)
 
-
-async def insert_brands():
-    async with AsyncHTTPClient('https://example.com') as client:
-        brands_data = await client.get(
-            endpoint='/endpoint',
-            params={
-                'params': 'example',
-            }
+MODE_TITLES = {
+    'full': 'полный',
+    'incremental': 'инкрементальный',
+    'resume': 'продолжение прерванного'
+}
+
+
+def format_crawl_summary(mode: str, duration: float, levels: dict[str, dict], previous: CrawlRun | None) -> str:
+    requests = sum(stats['requests'] for stats in levels.values())
+    downloaded = sum(stats['bytes'] for stats in levels.values()) / 1024 / 1024
+    retries = sum(stats['retries'] for stats in levels.values())
+    errors = sum(stats['errors'] for stats in levels.values())
+    failed = sum(stats['failed'] for stats in levels.values())
+
+    previous_text = ''
+    if previous is not None and previous.duration:
+        previous_text = f' (прошлый: {previous.duration:.0f} сек., {previous.requests / previous.duration:.1f} запр./сек.)'
+
+    text = (
+        f'🕷 <b>Парсинг каталога: {MODE_TITLES[mode]}</b>\n'
+        f'\n'
+        f'Длительность: <b>{duration:.0f} сек.</b>, {requests / duration if duration else 0:.1f} запр./сек.{previous_text}\n'
+        f'Запросов: <b>{requests}</b>, скачано: <b>{downloaded:.1f} МБ</b>\n'
+        f'Повторов: <b>{retries}</b>, ошибок HTTP: <b>{errors}</b>, упавших узлов: <b>{failed}</b>\n'
+    )
+
+    for level, stats in levels.items():
+        level_requests = stats['requests']
+        level_downloaded = stats['bytes'] / 1024 / 1024
+        # Ошибка HTTP приводит и к падению узла, поэтому доля ошибок считается по упавшим узлам
+        error_rate = stats['failed'] / level_requests * 100 if level_requests else 0
+        text += (
+            f'\n🔹 <i>{level}</i>: {stats["duration"]:.0f} сек., {level_requests} запр., '
+            f'{level_downloaded:.1f} МБ, ошибок {error_rate:.1f}%, '
+            f'строк +{stats.get("inserted", 0)} ~{stats.get("updated", 0)}'
         )
 
-    brands = []
-    for node in brands_data['iNav']['Nodes']:
-        if node['Name'] == 'CarType':
-            for facet in node['Facets']:
-                if facet['IsSelected'] is True:
-                    for brand in facet['Refinements']['Nodes'][0]['Facets']:
-                        brands.append(
-                            {
-                                'code': brand['Metadata']['Code'][0],
-                                'action': brand['Action'],
-                                'display_value': brand['DisplayValue'],
-                                'eng_name': brand['Metadata']['EngName'][0]
-                            }
-                        )
-                    break
-            break
+    return text
 
-    async with get_db() as session:
-        brand_repo = BrandRepository(session)
-        await brand_repo.update_brands(brands)
 
+async def save_crawl_run(mode: str, duration: float, levels: dict[str, dict]) -> None:
+    """Сохраняет телеметрию обхода в crawl_runs и отправляет сводку в чат логов"""
 
-async def insert_models():
-    async with get_db() as session:
-        brand_repo = BrandRepository(session)
-        brands: list[tuple] = await brand_repo.get_all_brands_actions()
+    try:
+        async with get_db() as session:
+            crawl_run_repo = CrawlRunRepository(session)
+            previous = await crawl_run_repo.get_last(mode)
+            await crawl_run_repo.save(mode, duration, levels)
+
+        await bot.send_message(
+            chat_id=settings.LOG_CHAT_ID,
+            text=format_crawl_summary(mode, duration, levels, previous)
+        )
+    except Exception as e:
+        logger.error(f'Ошибка сохранения телеметрии парсинга: {str(e)}')
+
+
+async def keep_crawl_lock(frontier: CrawlFrontier, token: str) -> None:
+    while True:
+        await asyncio.sleep(settings.CRAWL_LOCK_SECONDS / 3)
 
-    models = []
-    for brand_id, action in brands:
         try:
-            async with AsyncHTTPClient('https://example') as client:
-                models_data = await client.get(
-                    endpoint='/endpoint',
-                    params={
-                        'param': 'example',
-                    }
-                )
+            if not await frontier.extend_lock(token, settings.CRAWL_LOCK_SECONDS):
+                logger.error('Блокировка парсинга каталога потеряна')
+                return
         except Exception as e:
-            logger.error(f'Ошибка получение моделей бренда ({bran_id}): {str(e)}')
-            continue
-
-        for node in models_data['iNav']['Nodes']:
-            if node['Name'] == 'CarType':
-                for facet in node['Facets']:
-                    if facet['IsSelected'] is True:
-                        for i in facet['Refinements']['Nodes'][0]['Facets']:
-                            if i['IsSelected'] is True:
-                                for model in i['Refinements']['Nodes'][0]['Facets']:
-                                    models.append(
-                                        {
-                                            'code': model['Metadata']['Code'][0],
-                                            'action': model['Action'],
-                                            'display_value': model['DisplayValue'],
-                                            'eng_name': model['Metadata']['EngName'][0],
-                                            'brand_id': brand_id
-                                        }
-                                    )
-
-                                break
-                        break
-                break
+            logger.error(f'Ошибка продления блокировки парсинга каталога: {str(e)}')
 
-    async with get_db() as session:
-        model_repo = ModelRepository(session)
-        await model_repo.update_models(models)
 
+async def daily_parsing_task():
+    frontier = CrawlFrontier(redis_client, max_attempts=settings.CRAWL_MAX_ATTEMPTS)
+    token = uuid4().hex
+
+    if not await frontier.acquire_lock(token, settings.CRAWL_LOCK_SECONDS):
+        logger.info('Парсинг каталога уже выполняется, запуск пропущен')
+        return
 
-async def insert_generations():
-    async with get_db() as session:
-        model_repo = ModelRepository(session)
-        models: list[tuple] = await model_repo.get_all_models_actions()
+    lock_task = asyncio.create_task(keep_crawl_lock(frontier, token))
 
-    generations = []
-    for model_id, action in models:
+    try:
+        await run_parsing(frontier)
+    finally:
+        lock_task.cancel()
         try:
-            async with AsyncHTTPClient('https://examle') as client:
-                generations_data = await client.get(
-                    endpoint='/endpoint',
-                    params={
-                        'param': 'example',
-                    }
-                )
+            await frontier.release_lock(token)
         except Exception as e:
-            logger.error(f'Ошибка получение поколений модели ({model_id}): {str(e)}')
-            continue
-
-        for node in generations_data['iNav']['Nodes']:
-            if node['Name'] == 'CarType':
-                for facet in node['Facets']:
-                    if facet['IsSelected'] is True:
-                        for i in facet['Refinements']['Nodes'][0]['Facets']:
-                            if i['IsSelected'] is True:
-                                for model in i['Refinements']['Nodes'][0]['Facets']:
-                                    if model['IsSelected'] is True:
-                                        for generation in model['Refinements']['Nodes'][0]['Facets']:
-                                            start_year = None
-                                            end_year = None
-
-                                            if generation['Metadata']['ModelStartDate']:
-                                                if generation['Metadata']['ModelStartDate'] != [None]:
-                                                    start_year = int(generation['Metadata']['ModelStartDate'][0][:4])
-
-                                            if generation['Metadata']['ModelEndDate']:
-                                                if generation['Metadata']['ModelEndDate'] != [None]:
-                                                    end_year = int(generation['Metadata']['ModelEndDate'][0][:4])
-
-                                            generations.append(
-                                                {
-                                                    'code': generation['Metadata']['Code'][0],
-                                                    'action': generation['Action'],
-                                                    'display_value': generation['DisplayValue'],
-                                                    'model_id': model_id,
-                                                    'start_year': start_year,
-                                                    'end_year': end_year
-                                                }
-                                            )
-
-                                        break
-                                break
-                        break
-                break
+            logger.error(f'Ошибка снятия блокировки парсинга каталога: {str(e)}')
 
-    async with get_db() as session:
-        generation_repo = GenerationRepository(session)
-        await generation_repo.update_generations(generations)
 
+async def run_parsing(frontier: CrawlFrontier):
+    logger.info('Запуск ежедневной задачи парсинга')
+
+    if circuit_breakers.get('encar').is_open:
+        run_date = datetime.now(pytz.timezone('Europe/Moscow')) + timedelta(minutes=settings.CRAWL_RETRY_DELAY_MINUTES)
+        logger.info(f'Encar недоступен, парсинг каталога отложен до {run_date}')
+
+        scheduler.add_job(
+            daily_parsing_task,
+            trigger='date',
+            run_date=run_date,
+            next_run_time=run_date,
+            id='daily_parsing_retry',
+            replace_existing=True
+        )
+        return
 
-async def insert_modifications():
     async with get_db() as session:
-        generation_repo = GenerationRepository(session)
-        generations: list[tuple] = await generation_repo.get_all_generation_actions()
+        catalog_repo = CatalogRepository(session)
 
-    modifications = []
-    for generation_id, action in generations:
-        try:
-            async with AsyncHTTPClient('https://example') as client:
-                modifications_data = await client.get(
-                    endpoint='/endpoint',
-                    params={
-                        'param': 'example',
-                    }
-                )
-        except Exception as e:
-            logger.error(f'Ошибка получение модификации поколения ({generation_id}): {str(e)}')
-            continue
-
-        for node in modifications_data['iNav']['Nodes']:
-            if node['Name'] == 'CarType':
-                for facet in node['Facets']:
-                    if facet['IsSelected'] is True:
-                        for i in facet['Refinements']['Nodes'][0]['Facets']:
-                            if i['IsSelected'] is True:
-                                for model in i['Refinements']['Nodes'][0]['Facets']:
-                                    if model['IsSelected'] is True:
-                                        for generation in model['Refinements']['Nodes'][0]['Facets']:
-                                            if generation['IsSelected'] is True:
-                                                if generation['Refinements']['Nodes']:
-                                                    for modification in generation['Refinements']['Nodes'][0]['Facets']:
-                                                        if not modification['Expression'].startswith('YearGroup.'):
-                                                            modifications.append(
-                                                                {
-                                                                    'code': modification['Metadata']['Code'][0],
-                                                                    'action': modification['Action'],
-                                                                    'display_value': modification['DisplayValue'],
-                                                                    'generation_id': generation_id
-                                                                }
-                                                            )
-                                                    break
-                                        break
-                                break
-                        break
-                break
+        if await frontier.is_resumable(settings.CRAWL_RESUME_HOURS * 3600):
+            # Предыдущий обход не завершился - продолжаем с сохраненных узлов.
+            # Несобранная версия каталога после падения переиспользуется, чтобы не потерять сделанную работу
+            is_full = await frontier.is_full()
+            seeds = await frontier.load()
+            mode = 'resume'
 
-    async with get_db() as session:
-        modification_repo = ModificationRepository(session)
-        await modification_repo.update_modifications(modifications)
+            snapshot = CatalogSnapshot(ready=await catalog_repo.snapshot_exists())
+        else:
+            # Раз в неделю обходим каталог полностью, в остальные дни - только изменившиеся поддеревья
+            is_full = datetime.now(pytz.timezone('Europe/Moscow')).weekday() == settings.CRAWL_FULL_WEEKDAY
+            await frontier.start('brands', is_full)
+            seeds = {'brands': [(None, None, False)]}
+            mode = 'full' if is_full else 'incremental'
 
+            # Копия каталога создается только при первом изменении - см. CatalogSnapshot
+            await catalog_repo.drop_snapshot()
+            snapshot = CatalogSnapshot()
 
-async def insert_configurations():
-    async with get_db() as session:
-        modification_repo = ModificationRepository(session)
-        modifications: list[tuple] = await modification_repo.get_all_modification_actions()
+    logger.info(f'Запущен процесс парсинга сайта encar ({MODE_TITLES[mode]})')
+
+    async with AsyncHTTPClient('https://example', priority=Priority.BACKGROUND, upstream='encar') as client:
+        crawler = CatalogCrawler(client, settings.CRAWL_DB_CONCURRENCY, is_full, frontier)
+        started_at = time.perf_counter()
 
-    configurations = []
-    for modification_id, action in modifications:
         try:
-            async with AsyncHTTPClient('https://example') as client:
-                configurations_data = await client.get(
-                    endpoint='/endpoint',
-                    params={
-                        'param': 'example',
-                    }
-                )
+            await crawler.run(catalog_levels(snapshot), seeds)
         except Exception as e:
-            logger.error(f'Ошибка получение конфигурации модификации ({modification_id}): {str(e)}')
-            continue
-
-        for node in configurations_data['iNav']['Nodes']:
-            if node['Name'] == 'CarType':
-                for facet in node['Facets']:
-                    if facet['IsSelected'] is True:
-                        for i in facet['Refinements']['Nodes'][0]['Facets']:
-                            if i['IsSelected'] is True:
-                                for model in i['Refinements']['Nodes'][0]['Facets']:
-                                    if model['IsSelected'] is True:
-                                        for generation in model['Refinements']['Nodes'][0]['Facets']:
-                                            if generation['IsSelected'] is True:
-                                                if generation['Refinements']['Nodes']:
-                                                    for modification in generation['Refinements']['Nodes'][0]['Facets']:
-                                                        if modification['IsSelected'] and not modification['Expression'].startswith('YearGroup.'):
-                                                            for configuration in modification['Refinements']['Nodes'][0]['Facets']:
-                                                                configurations.append(
-                                                                    {
-                                                                        'code': configuration['Metadata']['Code'][0],
-                                                                        'action': configuration['Action'],
-                                                                        'display_value': configuration['DisplayValue'],
-                                                                        'modification_id': modification_id,
-                                                                        'count': configuration['Count']
-                                                                    }
-                                                                )
-                                                            break
-                                                    break
-                                        break
-                                break
-                        break
-                break
-
-    async with get_db() as session:
-        configuration_repo = ConfigurationRepository(session)
+            logger.error(f'Ошибка парсинга каталога: {str(e)}')
 
-        while len(configurations) >= 4_000:
-            await configuration_repo.update_configurations(configurations[:4_000])
-            configurations = configurations[4_000:]
+        duration = time.perf_counter() - started_at
 
-        if configurations:
-            await configuration_repo.update_configurations(configurations)
+    summary = crawler.summary()
+    for level, stats in summary.items():
+        logger.info(f'Уровень {level}: {stats}')
+    logger.info(f'Парсинг завершен за {duration:.2f} сек., HTTP: {client.metrics.as_dict()}, объединение GET: {get_requests.as_dict()}')
 
+    await save_crawl_run(mode, duration, summary)
 
-async def daily_parsing_task():
-    logger.info('Запуск ежедневной задачи парсинга')
+    # Собранная версия согласована даже при ошибках отдельных узлов (там остаются прежние данные),
+    # поэтому публикуется всегда, а упавшие узлы дособираются следующим запуском.
+    # Если обход ничего не изменил, версия не создавалась и публиковать нечего
+    if snapshot.ready:
+        try:
+            async with get_db() as session:
+                catalog_repo = CatalogRepository(session)
+                await catalog_repo.publish_snapshot()
 
-    logger.info('Запущен процесс парсинга сайта encar')
+            catalog_version = await redis_client.incr('catalog:version')
+            logger.info(f'Опубликована версия каталога {catalog_version}')
+        except Exception as e:
+            logger.error(f'Ошибка публикации версии каталога: {str(e)}')
+    else:
+        logger.info('Каталог не изменился, публикация новой версии не требуется')
+
+    if await frontier.has_pending():
+        failed_count = await frontier.failed_count()
+        run_date = datetime.now(pytz.timezone('Europe/Moscow')) + timedelta(minutes=settings.CRAWL_RETRY_DELAY_MINUTES)
+
+        logger.error(f'Парсинг завершен с ошибками ({failed_count} узлов), повтор в {run_date}')
+
+        scheduler.add_job(
+            resume_parsing_task,
+            trigger='date',
+            run_date=run_date,
+            next_run_time=run_date,
+            id='daily_parsing_retry',
+            replace_existing=True
+        )
+    else:
+        parked = await frontier.parked()
+        if parked:
+            logger.error(
+                f'Парсинг завершен, отложено узлов без повтора: {len(parked)}\n'
+                + '\n'.join(f'{field}: попыток {attempts}, {error}' for field, (attempts, error) in parked.items())
+            )
 
-    try:
-        logger.info('Начало парсинга брендов...')
-        await insert_brands()
-        logger.info('Парсинг брендов завершен')
-    except Exception as e:
-        logger.error(f'Ошибка парсинга брендов: {str(e)}')
+        await frontier.finish()
 
-    try:
-        logger.info('Начало парсинга моделей...')
-        await insert_models()
-        logger.info('Парсинг моделей завершен')
-    except Exception as e:
-        logger.error(f'Ошибка парсинга моделей:{str(e)}')
-
-    try:
-        logger.info('Начало парсинга поколений...')
-        await insert_generations()
-        logger.info('Парсинг поколений завершен')
-    except Exception as e:
-        logger.error(f'Ошибка парсинга поколений:{str(e)}')
+    logger.info('Ежедневный задача парсинга выполнен')
 
-    try:
-        logger.info('Начало парсинга модификаций...')
-        await insert_modifications()
-        logger.info('Парсинг модификаций завершен')
-    except Exception as e:
-        logger.error(f'Ошибка парсинга модификаций:{str(e)}')
 
-    try:
-        logger.info('Начало парсинга конфигураций...')
-        await insert_configurations()
-        logger.info('Парсинг конфигураций завершен')
-    except Exception as e:
-        logger.error(f'Ошибка парсинга конфигураций:{str(e)}')
+async def resume_parsing_task():
+    frontier = CrawlFrontier(redis_client, max_attempts=settings.CRAWL_MAX_ATTEMPTS)
 
-    logger.info(f'Парсинг завершен')
-    
-    logger.info('Ежедневный задача парсинга выполнен')
+    if await frontier.is_resumable(settings.CRAWL_RESUME_HOURS * 3600):
+        logger.info('Обнаружен незавершенный парсинг каталога')
+        await daily_parsing_task()
@@ -3,6 +3,7 @@ from config import settings
 from utils.logger import setup_logger
 from database.base import get_db
 from database.repository.user import UserRepository
+from bot.functions import search_cache, car_info_cache, displacement_index
 
 logger = setup_logger(__name__)
 
@@ -31,3 +32,34 @@ async def daily_statistics_task():
             logger.info('Задача по отправке сообщении статистики по запускам бота выполнена успешно')
     except Exception as e:
         logger.error(f'Ошибка отправки сообщения статистики по запускам бота: {str(e)}')
+
+
+async def cache_statistics_task():
+    """Сводка по кэшам запросов к encar за сутки в чат логов"""
+
+    try:
+        text = '🗄 <b>Кэши encar за сутки</b>\n'
+
+        for title, cache in (('Поиск', search_cache), ('Карточки авто (Redis)', car_info_cache.remote)):
+            stats = await cache.stats(reset=True)
+            text += (
+                f'\n<b>{title}</b>\n'
+                f'🔹 <i>Попаданий</i>: <b>{stats["hits"]}</b> (устаревших: {stats["stale"]})\n'
+                f'🔹 <i>Промахов</i>: <b>{stats["misses"]}</b>\n'
+                f'🔹 <i>Доля попаданий</i>: <b>{stats["hit_rate"] * 100:.1f}%</b>\n'
+                f'🔹 <i>Сэкономлено времени ответа</i>: <b>{stats["saved"]:.0f} сек.</b>\n'
+            )
+
+        text += f'\nПопаданий в память процесса (карточки авто): <b>{car_info_cache.local_hits}</b>\n'
+        car_info_cache.local_hits = 0
+
+        stats = await displacement_index.stats(reset=True)
+        text += (
+            f'\n<b>Индекс объема двигателя</b>\n'
+            f'🔹 <i>Без загрузки страницы</i>: <b>{stats["hits"]}</b>, <i>с загрузкой</i>: <b>{stats["misses"]}</b>\n'
+            f'🔹 <i>Доля попаданий</i>: <b>{stats["hit_rate"] * 100:.1f}%</b>'
+        )
+
+        await bot.send_message(chat_id=settings.LOG_CHAT_ID, text=text)
+    except Exception as e:
+        logger.error(f'Ошибка отправки статистики кэшей: {str(e)}')
@@ -0,0 +1,11 @@
+from utils.logger import setup_logger
+from services.tariffs import tariffs
+
+logger = setup_logger(__name__)
+
+
+async def tariffs_reload_task():
+    try:
+        tariffs.reload_if_changed()
+    except Exception as e:
+        logger.error(f'Ошибка проверки таблицы тарифов: {str(e)}')
@@ -0,0 +1,38 @@
+"""Микробенчмарк разбора iNav: вложенные циклы против FacetPath - python tests/bench_catalog_loops.py"""
+
+import random
+import timeit
+
+import conftest  # noqa: F401 - путь к app и настройки, как под pytest
+import catalog_loops
+from services import catalog
+from test_facets import PARSERS, make_tree
+
+TREES = 200
+NUMBER = 20
+
+
+def main():
+    rng = random.Random(2025)
+
+    for name in PARSERS:
+        old, new = getattr(catalog_loops, name), getattr(catalog, name)
+        trees = []
+
+        # Только деревья, которые разбирают оба варианта
+        while len(trees) < TREES:
+            tree = make_tree(rng)
+            try:
+                old(tree, 1)
+            except IndexError:
+                continue
+            trees.append(tree)
+
+        loops = timeit.timeit(lambda: [old(tree, 1) for tree in trees], number=NUMBER)
+        facets = timeit.timeit(lambda: [new(tree, 1) for tree in trees], number=NUMBER)
+
+        print(f'{name}: циклы {loops / NUMBER / TREES * 1e6:.1f} мкс, FacetPath {facets / NUMBER / TREES * 1e6:.1f} мкс на ответ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Память и время разбора записей поиска: словари API против SearchCar/списков - python tests/bench_records.py"""
+
+import json
+import timeit
+import tracemalloc
+
+import conftest  # noqa: F401 - путь к app и настройки, как под pytest
+from services.records import SearchCar
+from test_records import SEARCH_ITEM
+
+CARS = 5_000
+NUMBER = 20
+
+
+def make_items() -> list[dict]:
+    return [{**SEARCH_ITEM, 'Id': str(38_900_000 + i), 'Mileage': float(i * 7)} for i in range(CARS)]
+
+
+def allocated(build) -> int:
+    tracemalloc.start()
+    snapshot = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del snapshot
+    return size
+
+
+def main():
+    raw = json.dumps(make_items())
+    compact = json.dumps([SearchCar.from_api(item).to_list() for item in make_items()])
+
+    # Что держит процесс после разбора ответа: словари API, записи со __slots__ или их списки
+    dicts = allocated(lambda: json.loads(raw))
+    records = allocated(lambda: [SearchCar.from_api(item) for item in json.loads(raw)])
+    lists = allocated(lambda: json.loads(compact))
+
+    # Чтение выдачи из FSM/кэша: исходные словари против списков с восстановлением записей
+    decode_dicts = timeit.timeit(lambda: json.loads(raw), number=NUMBER)
+    decode_records = timeit.timeit(lambda: [SearchCar.from_list(values) for values in json.loads(compact)], number=NUMBER)
+
+    print(f'{CARS} авто')
+    print(f'JSON: словари {len(raw) / CARS:.0f} байт, списки {len(compact) / CARS:.0f} байт на авто')
+    print(f'Память: словари {dicts / CARS:.0f}, записи SearchCar {records / CARS:.0f}, списки {lists / CARS:.0f} байт на авто')
+    print(f'Разбор: словари {decode_dicts / NUMBER / CARS * 1e6:.2f} мкс, списки в SearchCar {decode_records / NUMBER / CARS * 1e6:.2f} мкс на авто')
+
+
+if __name__ == '__main__':
+    main()
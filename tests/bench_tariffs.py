@@ -0,0 +1,39 @@
+"""Микробенчмарк расчета пошлин: python tests/bench_tariffs.py"""
+
+import json
+import timeit
+
+import conftest  # noqa: F401 - путь к app и настройки, как под pytest
+import tariff_ladders
+from services.tariffs import TariffTables, DEFAULT_TARIFFS_PATH
+
+EUR_RATE = 94.04
+NUMBER = 200_000
+
+
+def main():
+    with open(DEFAULT_TARIFFS_PATH, encoding='utf-8') as file:
+        tables = TariffTables(json.load(file))
+
+    ladders = timeit.timeit(
+        lambda: (
+            tariff_ladders.calc_recycling_fee(4, 2_500, False, False),
+            tariff_ladders.calc_custom_duty(4, 3_000_000, 2_500, False, EUR_RATE),
+            tariff_ladders.calc_custom_clearance(3_000_000)
+        ),
+        number=NUMBER
+    )
+    table = timeit.timeit(
+        lambda: (
+            tables.recycling_fee(4, 2_500, False),
+            tables.custom_duty(4, 3_000_000, 2_500, EUR_RATE),
+            tables.custom_clearance(3_000_000)
+        ),
+        number=NUMBER
+    )
+
+    print(f'if/elif: {ladders / NUMBER * 1e6:.2f} мкс, таблица: {table / NUMBER * 1e6:.2f} мкс (три расчета на авто)')
+
+
+if __name__ == '__main__':
+    main()
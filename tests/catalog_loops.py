@@ -0,0 +1,163 @@
+"""
+Разбор iNav вложенными циклами до перевода на FacetPath - эталон для test_facets.py.
+Функции без изменений
+"""
+
+
+def parse_brands(brands_data: dict, _: None = None) -> list[dict]:
+    brands = []
+    for node in brands_data['iNav']['Nodes']:
+        if node['Name'] == 'CarType':
+            for facet in node['Facets']:
+                if facet['IsSelected'] is True:
+                    for brand in facet['Refinements']['Nodes'][0]['Facets']:
+                        brands.append(
+                            {
+                                'code': brand['Metadata']['Code'][0],
+                                'action': brand['Action'],
+                                'display_value': brand['DisplayValue'],
+                                'eng_name': brand['Metadata']['EngName'][0],
+                                'count': brand['Count']
+                            }
+                        )
+                    break
+            break
+
+    return brands
+
+
+def parse_models(models_data: dict, brand_id: int) -> list[dict]:
+    models = []
+    for node in models_data['iNav']['Nodes']:
+        if node['Name'] == 'CarType':
+            for facet in node['Facets']:
+                if facet['IsSelected'] is True:
+                    for i in facet['Refinements']['Nodes'][0]['Facets']:
+                        if i['IsSelected'] is True:
+                            for model in i['Refinements']['Nodes'][0]['Facets']:
+                                models.append(
+                                    {
+                                        'code': model['Metadata']['Code'][0],
+                                        'action': model['Action'],
+                                        'display_value': model['DisplayValue'],
+                                        'eng_name': model['Metadata']['EngName'][0],
+                                        'brand_id': brand_id,
+                                        'count': model['Count']
+                                    }
+                                )
+
+                            break
+                    break
+            break
+
+    return models
+
+
+def parse_generations(generations_data: dict, model_id: int) -> list[dict]:
+    generations = []
+    for node in generations_data['iNav']['Nodes']:
+        if node['Name'] == 'CarType':
+            for facet in node['Facets']:
+                if facet['IsSelected'] is True:
+                    for i in facet['Refinements']['Nodes'][0]['Facets']:
+                        if i['IsSelected'] is True:
+                            for model in i['Refinements']['Nodes'][0]['Facets']:
+                                if model['IsSelected'] is True:
+                                    for generation in model['Refinements']['Nodes'][0]['Facets']:
+                                        start_year = None
+                                        end_year = None
+
+                                        if generation['Metadata']['ModelStartDate']:
+                                            if generation['Metadata']['ModelStartDate'] != [None]:
+                                                start_year = int(generation['Metadata']['ModelStartDate'][0][:4])
+
+                                        if generation['Metadata']['ModelEndDate']:
+                                            if generation['Metadata']['ModelEndDate'] != [None]:
+                                                end_year = int(generation['Metadata']['ModelEndDate'][0][:4])
+
+                                        generations.append(
+                                            {
+                                                'code': generation['Metadata']['Code'][0],
+                                                'action': generation['Action'],
+                                                'display_value': generation['DisplayValue'],
+                                                'model_id': model_id,
+                                                'start_year': start_year,
+                                                'end_year': end_year,
+                                                'count': generation['Count']
+                                            }
+                                        )
+
+                                    break
+                            break
+                    break
+            break
+
+    return generations
+
+
+def parse_modifications(modifications_data: dict, generation_id: int) -> list[dict]:
+    modifications = []
+    for node in modifications_data['iNav']['Nodes']:
+        if node['Name'] == 'CarType':
+            for facet in node['Facets']:
+                if facet['IsSelected'] is True:
+                    for i in facet['Refinements']['Nodes'][0]['Facets']:
+                        if i['IsSelected'] is True:
+                            for model in i['Refinements']['Nodes'][0]['Facets']:
+                                if model['IsSelected'] is True:
+                                    for generation in model['Refinements']['Nodes'][0]['Facets']:
+                                        if generation['IsSelected'] is True:
+                                            if generation['Refinements']['Nodes']:
+                                                for modification in generation['Refinements']['Nodes'][0]['Facets']:
+                                                    if not modification['Expression'].startswith('YearGroup.'):
+                                                        modifications.append(
+                                                            {
+                                                                'code': modification['Metadata']['Code'][0],
+                                                                'action': modification['Action'],
+                                                                'display_value': modification['DisplayValue'],
+                                                                'generation_id': generation_id,
+                                                                'count': modification['Count']
+                                                            }
+                                                        )
+                                                break
+                                    break
+                            break
+                    break
+            break
+
+    return modifications
+
+
+def parse_configurations(configurations_data: dict, modification_id: int) -> list[dict]:
+    configurations = []
+    for node in configurations_data['iNav']['Nodes']:
+        if node['Name'] == 'CarType':
+            for facet in node['Facets']:
+                if facet['IsSelected'] is True:
+                    for i in facet['Refinements']['Nodes'][0]['Facets']:
+                        if i['IsSelected'] is True:
+                            for model in i['Refinements']['Nodes'][0]['Facets']:
+                                if model['IsSelected'] is True:
+                                    for generation in model['Refinements']['Nodes'][0]['Facets']:
+                                        if generation['IsSelected'] is True:
+                                            if generation['Refinements']['Nodes']:
+                                                for modification in generation['Refinements']['Nodes'][0]['Facets']:
+                                                    if modification['IsSelected'] and not modification['Expression'].startswith('YearGroup.'):
+                                                        for configuration in modification['Refinements']['Nodes'][0]['Facets']:
+                                                            configurations.append(
+                                                                {
+                                                                    'code': configuration['Metadata']['Code'][0],
+                                                                    'action': configuration['Action'],
+                                                                    'display_value': configuration['DisplayValue'],
+                                                                    'modification_id': modification_id,
+                                                                    'count': configuration['Count']
+                                                                }
+                                                            )
+                                                        break
+                                                break
+                                    break
+                            break
+                    break
+            break
+
+    return configurations
@@ -0,0 +1,22 @@
+import os
+import sys
+from pathlib import Path
+
+# Модули бота импортируются от каталога app, как при запуске app/main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'app'))
+
+# Обязательные настройки без значений по умолчанию. Проверяются только чистые функции,
+# к Postgres, Redis и Telegram тесты не подключаются
+for name, value in {
+    'POSTGRES_USER': 'test',
+    'POSTGRES_PASSWORD': 'test',
+    'POSTGRES_DB': 'test',
+    'POSTGRES_HOST': 'localhost',
+    'REDIS_PASSWORD': 'test',
+    'TELEGRAM_BOT_TOKEN': '123456:test',
+    'TWO_CAPTCHA_KEY': 'test',
+    'LOG_CHAT_ID': '0',
+    'STATEMENT_CHAT_ID': '0',
+    'STATISTICS_CHAT_ID': '0',
+}.items():
+    os.environ.setdefault(name, value)
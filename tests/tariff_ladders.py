@@ -0,0 +1,129 @@
+"""
+Расчет пошлин лестницами if/elif до перевода на таблицу tariffs.json - эталон для test_tariffs.py.
+Курс EUR передается параметром вместо settings.EUR_RATE, остальное без изменений
+"""
+
+
+def calc_recycling_fee(car_age: int, engine_volume: int, is_electro: bool, is_almost_old: bool) -> int:
+    """
+    https://customs.gov.ru/fiz/uplata-tamozhennyx-platezhej/uplata-utilizaczionnogo-sbora/utilizaczionnyj-sbor-na-kolesnye-transportnye-sredstva/ischislenie-utilizaczionnogo-sbora
+
+    Пункт: В отношении легковых автомобилей для личного пользования
+    """
+
+    if is_almost_old:
+        car_age += 1
+
+    if car_age < 3:
+        if is_electro:
+            base_coefficient = 0.17
+        else:
+            if engine_volume < 1_000:
+                base_coefficient = 0.17
+            elif 1_000 <= engine_volume < 2_000:
+                base_coefficient = 0.17
+            elif 2_000 <= engine_volume < 3_000:
+                base_coefficient = 0.17
+            elif 3_000 <= engine_volume < 3_500:
+                base_coefficient = 107.67
+            else:
+                base_coefficient = 137.11
+
+    else:
+        if is_electro:
+            base_coefficient = 0.26
+        else:
+            if engine_volume < 1_000:
+                base_coefficient = 0.26
+            elif 1_000 <= engine_volume < 2_000:
+                base_coefficient = 0.26
+            elif 2_000 <= engine_volume < 3_000:
+                base_coefficient = 0.26
+            elif 3_000 <= engine_volume < 3_500:
+                base_coefficient = 164.84
+            else:
+                base_coefficient = 180.24
+
+    recycling_fee = 20_000 * base_coefficient  # Утилизационный сбор
+
+    return int(recycling_fee)
+
+
+def calc_custom_duty(car_age: int, car_price: int, engine_volume: int, is_almost_old: bool, eur_rate: float) -> int:
+    """https://customs.gov.ru/fiz/pravila-peremeshheniya-tovarov/transportnye-sredstva/vvoz-transportnyx-sredstv-dlya-lichnogo-pol-zovaniya/stavki-tamozhennyx-poshlin,-nalogov-v-otnoshenii-transportnyx-sredstv-dlya-lichnogo-pol-zovaniya"""
+    if is_almost_old:
+        car_age += 1
+
+    if car_age < 3:
+        euro_price = car_price / eur_rate
+        multiplier = 0.48
+
+        if euro_price < 8_500:
+            custom_duty = engine_volume * 2.5
+            multiplier = 0.54
+        elif 8_500 <= euro_price < 16_700:
+            custom_duty = engine_volume * 3.5
+        elif 16_700 <= euro_price < 42_300:
+            custom_duty = engine_volume * 5.5
+        elif 42_300 <= euro_price < 84_500:
+            custom_duty = engine_volume * 7.5
+        elif 84_500 <= euro_price < 169_000:
+            custom_duty = engine_volume * 15
+        else:
+            custom_duty = engine_volume * 20
+
+        if car_price * multiplier > custom_duty * eur_rate:
+            return int(car_price * multiplier)
+        else:
+            return int(custom_duty * eur_rate)
+
+    elif 3 <= car_age < 5:
+        if engine_volume < 1_000:
+            custom_duty = engine_volume * 1.5
+        elif 1_000 <= engine_volume < 1_500:
+            custom_duty = engine_volume * 1.7
+        elif 1_500 <= engine_volume < 1_800:
+            custom_duty = engine_volume * 2.5
+        elif 1_800 <= engine_volume < 2_300:
+            custom_duty = engine_volume * 2.7
+        elif 2_300 <= engine_volume < 3_000:
+            custom_duty = engine_volume * 3
+        else:
+            custom_duty = engine_volume * 3.6
+    else:
+        if engine_volume < 1_000:
+            custom_duty = engine_volume * 3
+        elif 1_000 <= engine_volume < 1_500:
+            custom_duty = engine_volume * 3.2
+        elif 1_500 <= engine_volume < 1_800:
+            custom_duty = engine_volume * 3.5
+        elif 1_800 <= engine_volume < 2_300:
+            custom_duty = engine_volume * 4.8
+        elif 2_300 <= engine_volume < 3_000:
+            custom_duty = engine_volume * 5
+        else:
+            custom_duty = engine_volume * 5.7
+
+    custom_duty = custom_duty * eur_rate  # Таможенная пошлина
+    return int(custom_duty)
+
+
+def calc_custom_clearance(car_price: int) -> int:
+    # Таможенное оформление
+
+    if car_price <= 200_000:
+        return 1_067
+    elif 200_000.01 <= car_price <= 450_000:
+        return 2_134
+    elif 450_000.01 <= car_price <= 1_200_000:
+        return 4_269
+    elif 1_200_000.01 <= car_price <= 2_700_000:
+        return 11_746
+    elif 2_700_000.01 <= car_price <= 4_200_000:
+        return 16_524
+    elif 4_200_000.01 <= car_price <= 5_500_000:
+        return 21_344
+    elif 5_500_000.01 <= car_price <= 7_000_000:
+        return 27_540
+    else:
+        return 30_000
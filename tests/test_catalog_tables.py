@@ -0,0 +1,43 @@
+import random
+
+import pytest
+from sqlalchemy import UniqueConstraint
+
+from services import catalog
+from database.repository.catalog import CATALOG_TABLES
+from test_facets import make_tree
+
+
+def parsed_rows(level: str) -> list[dict]:
+    rng = random.Random(level)
+
+    while True:
+        try:
+            rows = getattr(catalog, f'parse_{level}')(make_tree(rng), 1)
+        except IndexError:
+            continue
+
+        if rows:
+            return rows
+
+
+@pytest.mark.parametrize('level', CATALOG_TABLES)
+def test_parsed_rows_cover_copy_columns(level):
+    # COPY берет значения строго по ключам и полям уровня - лишних и недостающих быть не должно
+    _, keys, fields = CATALOG_TABLES[level]
+
+    for row in parsed_rows(level):
+        assert set(row) == set(keys + fields)
+
+
+@pytest.mark.parametrize('level', CATALOG_TABLES)
+def test_merge_keys_match_unique_constraint(level):
+    # ON CONFLICT слияния опирается на уникальный индекс по ключам уровня
+    model, keys, fields = CATALOG_TABLES[level]
+    table = model.__table__
+
+    assert set(keys + fields) <= set(table.c.keys())
+    assert any(
+        isinstance(constraint, UniqueConstraint) and tuple(constraint.columns.keys()) == keys
+        for constraint in table.constraints
+    )
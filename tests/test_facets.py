@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+import catalog_loops
+from services import catalog
+from services.facets import FacetPath, is_selected, is_not_year_group
+
+PARSERS = ('parse_brands', 'parse_models', 'parse_generations', 'parse_modifications', 'parse_configurations')
+
+
+def make_facet(rng: random.Random, depth: int) -> dict:
+    facet = {
+        'IsSelected': rng.random() < 0.4,
+        'Expression': rng.choice(['YearGroup.2020', 'Model.X']),
+        'Action': f'action{rng.randint(0, 999)}',
+        'DisplayValue': f'value{rng.randint(0, 999)}',
+        'Count': rng.randint(0, 500),
+        'Metadata': {
+            'Code': [f'c{rng.randint(0, 999)}'],
+            'EngName': [f'name{rng.randint(0, 999)}'],
+            'ModelStartDate': rng.choice([None, [None], ['201905']]),
+            'ModelEndDate': rng.choice([None, [None], ['202311']])
+        }
+    }
+
+    if depth < 5 and rng.random() > 0.1:
+        facet['Refinements'] = {'Nodes': [{'Facets': [make_facet(rng, depth + 1) for _ in range(rng.randint(1, 3))]}]}
+    else:
+        facet['Refinements'] = {'Nodes': []}
+
+    return facet
+
+
+def make_tree(rng: random.Random) -> dict:
+    return {
+        'iNav': {
+            'Nodes': [
+                {'Name': 'Price', 'Facets': []},
+                {'Name': 'CarType', 'Facets': [make_facet(rng, 0) for _ in range(3)]}
+            ]
+        }
+    }
+
+
+@pytest.mark.parametrize('name', PARSERS)
+def test_facet_paths_match_nested_loops(name):
+    rng = random.Random(name)
+    compared = 0
+
+    for _ in range(1_000):
+        tree = make_tree(rng)
+
+        try:
+            expected = getattr(catalog_loops, name)(tree, 1)
+        except IndexError:
+            # Циклы падали на выбранной фасете без уточнений, FacetPath ищет следующую подходящую - не сравниваем
+            continue
+
+        assert getattr(catalog, name)(tree, 1) == expected
+        compared += 1
+
+    assert compared > 300
+
+
+def test_emit_filters_last_level_only():
+    tree = {
+        'iNav': {
+            'Nodes': [
+                {
+                    'Name': 'CarType',
+                    'Facets': [
+                        {'IsSelected': False, 'Expression': 'A', 'Refinements': {'Nodes': [{'Facets': [{'Expression': 'X'}]}]}},
+                        {
+                            'IsSelected': True,
+                            'Expression': 'YearGroup.2020',
+                            'Refinements': {
+                                'Nodes': [{'Facets': [{'Expression': 'YearGroup.2021'}, {'Expression': 'Model.A'}]}]
+                            }
+                        }
+                    ]
+                }
+            ]
+        }
+    }
+
+    assert list(FacetPath('CarType', (is_selected,)).extract(tree)) == [{'Expression': 'YearGroup.2021'}, {'Expression': 'Model.A'}]
+    assert list(FacetPath('CarType', (is_selected,), emit=is_not_year_group).extract(tree)) == [{'Expression': 'Model.A'}]
+    assert list(FacetPath('Missing', (is_selected,)).extract(tree)) == []
@@ -0,0 +1,63 @@
+import asyncio
+
+from services.utils import HTTPSessionPool, AsyncHTTPClient, http_sessions, request_key
+
+
+def test_pool_reuses_one_session_per_base_url():
+    async def run():
+        pool = HTTPSessionPool()
+        pool.open()
+
+        first = pool.get('https://api.example.com')
+        assert pool.get('https://api.example.com') is first
+        assert pool.get('https://www.example.com') is not first
+
+        await pool.close()
+        assert first.closed and not pool.is_open and not pool.sessions
+
+    asyncio.run(run())
+
+
+def test_pool_replaces_closed_session():
+    async def run():
+        pool = HTTPSessionPool()
+        session = pool.get('https://api.example.com')
+        await session.close()
+
+        replacement = pool.get('https://api.example.com')
+        assert replacement is not session and not replacement.closed
+
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_clients_borrow_pooled_session_and_leave_it_open():
+    async def run():
+        http_sessions.open()
+        try:
+            async with AsyncHTTPClient('https://api.example.com/') as first:
+                session = first.session
+            async with AsyncHTTPClient('https://api.example.com') as second:
+                assert second.session is session
+
+            assert not session.closed
+        finally:
+            await http_sessions.close()
+
+        # Без открытого пула клиент работает на своей сессии и закрывает ее сам
+        async with AsyncHTTPClient('https://api.example.com') as client:
+            private = client.session
+            assert private is not session
+        assert private.closed
+
+    asyncio.run(run())
+
+
+def test_request_key_covers_every_param():
+    url = 'https://api.example.com/search'
+
+    assert request_key(url, {'q': 'a', 'sr': '|0|20'}) == request_key(url, {'sr': '|0|20', 'q': 'a'})
+    assert request_key(url, {'q': 'a', 'sr': '|0|20'}) != request_key(url, {'q': 'a', 'sr': '|20|20'})
+    assert request_key(url, {'q': 'a'}) != request_key(url, {'q': 'a.b'})
+    assert request_key(url) != request_key('https://api.example.com/other')
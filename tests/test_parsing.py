@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from services.parsing import extract_preloaded_state, extract_preloaded_state_soup, parse_car_info_html
+
+STATES = [
+    {'cars': {'base': {'queryCarId': 1}}},
+    # Скобки и маркер внутри строк не должны сбивать разбор
+    {'text': 'a } b { c', 'script': '</div> __PRELOADED_STATE__ = 1', 'nested': [{'x': [1, 2, {'y': None}]}]},
+    {'unicode': 'Хёндэ 현대', 'float': 1.5e3, 'flag': False}
+]
+
+TEMPLATES = [
+    '<html><head><script>window.__PRELOADED_STATE__ = {state};</script></head><body></body></html>',
+    '<html><script>\n  __PRELOADED_STATE__={state}\n</script><script>var other = 1;</script></html>'
+]
+
+
+@pytest.mark.parametrize('template', TEMPLATES)
+@pytest.mark.parametrize('state', STATES)
+def test_fast_extraction_matches_soup(template, state):
+    html = template.format(state=json.dumps(state, ensure_ascii=False))
+
+    assert extract_preloaded_state(html) == state
+    assert extract_preloaded_state_soup(html) == state
+
+
+@pytest.mark.parametrize('state', STATES)
+def test_fast_extraction_stops_at_object_end(state):
+    # BeautifulSoup-разбор берет весь остаток скрипта и на таком коде падает
+    html = f'<script>window.__PRELOADED_STATE__   =   {json.dumps(state)} ; window.x = {{}};</script>'
+
+    assert extract_preloaded_state(html) == state
+
+
+def test_fast_extraction_rejects_broken_pages():
+    assert extract_preloaded_state('<html><script>var x = 1;</script></html>') is None
+    assert extract_preloaded_state('<script>__PRELOADED_STATE__;</script>') is None
+    assert extract_preloaded_state('<script>__PRELOADED_STATE__ = {"a": </script>') is None
+    assert extract_preloaded_state('<script>__PRELOADED_STATE__ = [1, 2]</script>') is None
+
+
+def test_soup_fallback_is_used_when_fast_scan_fails():
+    # Маркер встречается в тексте раньше скрипта - быстрый поиск находит не то место
+    html = '<p>__PRELOADED_STATE__</p><script>window.__PRELOADED_STATE__ = {"id": 7};</script>'
+
+    assert extract_preloaded_state(html) is None
+    assert parse_car_info_html(html) == {'id': 7}
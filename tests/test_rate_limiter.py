@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from services.rate_limiter import TokenBucket, Priority
+
+
+def test_background_keeps_reserve_for_users():
+    async def run():
+        # Скорость почти нулевая - ведро не пополняется за время теста
+        bucket = TokenBucket(max_rate=0.001, burst=2, reserve=1, min_rate=0.001)
+
+        await bucket.acquire(Priority.BACKGROUND)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(bucket.acquire(Priority.BACKGROUND), 0.05)
+
+        await asyncio.wait_for(bucket.acquire(Priority.INTERACTIVE), 0.05)
+        assert bucket.tokens < 1
+
+    asyncio.run(run())
+
+
+def test_interactive_lane_is_served_first():
+    async def run():
+        bucket = TokenBucket(max_rate=50, burst=2, reserve=1, min_rate=1)
+        await bucket.acquire()
+        await bucket.acquire()
+
+        order = []
+
+        async def request(priority: Priority) -> None:
+            await bucket.acquire(priority)
+            order.append(priority)
+
+        # Фоновый запрос встал в очередь раньше, но пользовательский обслуживается первым
+        background = asyncio.create_task(request(Priority.BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request(Priority.INTERACTIVE))
+
+        await asyncio.wait_for(asyncio.gather(background, interactive), 1)
+        assert order == [Priority.INTERACTIVE, Priority.BACKGROUND]
+
+    asyncio.run(run())
+
+
+def test_throttle_and_recover_stay_within_bounds():
+    bucket = TokenBucket(max_rate=8, burst=4, reserve=10, min_rate=1)
+    assert bucket.reserve == 3
+
+    for _ in range(10):
+        bucket.throttle()
+    assert bucket.rate == 1
+
+    for _ in range(100):
+        bucket.recover()
+    assert bucket.rate == 8
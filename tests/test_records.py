@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from services.parsing import parse_car_detail
+from services.records import SearchCar, CarDetail
+
+SEARCH_ITEM = {
+    'Id': '38912345',
+    'Manufacturer': '현대',
+    'Model': '그랜저',
+    'Badge': '2.5 익스클루시브',
+    'Year': 202203.0,
+    'FormYear': '2022',
+    'Mileage': 15234.0,
+    'FuelType': '가솔린',
+    'Price': 3450.0,
+    'Photos': [{'location': f'/carpicture/{i}.jpg'} for i in range(12)],
+    'ServiceMark': ['EncarDiagnosisP0']
+}
+
+CAR_STATE = {
+    'cars': {
+        'base': {
+            'queryCarId': 38912345,
+            'category': {
+                'manufacturerEnglishName': 'Hyundai',
+                'modelName': '그랜저',
+                'gradeEnglishName': '2.5 Exclusive',
+                'yearMonth': '202203'
+            },
+            'spec': {'mileage': 15234, 'fuelName': '가솔린', 'displacement': 2497},
+            'advertisement': {'price': 3450},
+            'photos': [
+                {'path': '/a_001.jpg', 'type': 'OUTER'},
+                {'path': '/a_002.jpg', 'type': 'INNER'},
+                {'path': '/a_003.jpg', 'type': 'OUTER'}
+            ]
+        }
+    }
+}
+
+
+def test_search_car_from_api():
+    car = SearchCar.from_api(SEARCH_ITEM)
+
+    assert (car.id, car.year_month, car.mileage, car.grade) == (38912345, 202203, 15234, '2.5 익스클루시브')
+    assert len(car.photos) == 10
+    assert SearchCar.from_api({**SEARCH_ITEM, 'Photos': None}).photos == []
+
+
+def test_car_detail_from_api():
+    car = CarDetail.from_api(CAR_STATE)
+
+    assert (car.id, car.manufacturer, car.year_month, car.displacement) == (38912345, 'Hyundai', 202203, 2497)
+    assert car.photos == ['/a_001.jpg', '/a_003.jpg']
+
+
+@pytest.mark.parametrize('record', [SearchCar.from_api(SEARCH_ITEM), CarDetail.from_api(CAR_STATE)])
+def test_list_round_trip(record):
+    # Так запись проходит через FSM и кэши
+    values = json.loads(json.dumps(record.to_list()))
+    restored = type(record).from_list(values)
+
+    assert restored.to_list() == record.to_list()
+    assert not hasattr(record, '__dict__')
+
+
+def test_from_list_rejects_wrong_length():
+    with pytest.raises(ValueError):
+        SearchCar.from_list(SearchCar.from_api(SEARCH_ITEM).to_list()[:-1])
+
+
+def test_parse_car_detail_returns_record_list():
+    html = f'<script>window.__PRELOADED_STATE__ = {json.dumps(CAR_STATE)};</script>'
+
+    assert parse_car_detail(html) == CarDetail.from_api(CAR_STATE).to_list()
+    assert parse_car_detail('<html></html>') is None
+
+
+def test_search_car_to_detail_keeps_card_fields():
+    car = SearchCar.from_api(SEARCH_ITEM)
+    detail = car.to_detail(2497)
+
+    assert isinstance(detail, CarDetail)
+    assert (detail.id, detail.grade, detail.year_month, detail.price, detail.displacement) == (car.id, car.grade, car.year_month, car.price, 2497)
+    assert detail.photos == car.photos
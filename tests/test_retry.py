@@ -0,0 +1,37 @@
+import random
+from datetime import datetime, timedelta, UTC
+from email.utils import format_datetime
+
+from services.retry import RetryPolicy, parse_retry_after
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after('1.5') == 1.5
+    assert parse_retry_after('-3') == 0
+
+
+def test_parse_retry_after_http_date():
+    future = format_datetime(datetime.now(UTC) + timedelta(seconds=60), usegmt=True)
+    past = format_datetime(datetime.now(UTC) - timedelta(seconds=60), usegmt=True)
+
+    assert 55 <= parse_retry_after(future) <= 60
+    assert parse_retry_after(past) == 0
+
+
+def test_parse_retry_after_invalid():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after('soon') is None
+
+
+def test_backoff_bounds():
+    random.seed(13)
+    policy = RetryPolicy(base_delay=0.5, max_delay=4)
+
+    for attempt in range(10):
+        for _ in range(200):
+            assert 0 <= policy.backoff(attempt) <= min(4, 0.5 * 2 ** attempt)
+
+    # Retry-After сервера важнее jitter, даже если больше max_delay
+    assert policy.backoff(0, retry_after=30) == 30
@@ -0,0 +1,48 @@
+import asyncio
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    async def run():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        assert await asyncio.gather(*(flight.do('car', fetch) for _ in range(5))) == [1] * 5
+        assert (calls, flight.hits, flight.misses, flight.calls, flight.waiters) == (1, 4, 1, {}, {})
+
+    asyncio.run(run())
+
+
+def test_call_survives_until_last_waiter_is_cancelled():
+    async def run():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            await asyncio.sleep(10)
+
+        # Предзагрузка и клик по авто ждут одну загрузку
+        prefetch = asyncio.create_task(flight.do('car', fetch))
+        click = asyncio.create_task(flight.do('car', fetch))
+        await started.wait()
+        call = flight.calls['car']
+
+        prefetch.cancel()
+        await asyncio.sleep(0)
+        assert not call.cancelled() and not click.done()
+
+        # Ждать больше некому - загрузка отменяется
+        click.cancel()
+        await asyncio.gather(prefetch, click, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert call.cancelled() and not flight.calls and not flight.waiters
+
+    asyncio.run(run())
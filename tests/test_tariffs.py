@@ -0,0 +1,78 @@
+import json
+import random
+from itertools import product
+
+import pytest
+
+import tariff_ladders
+from services.tariffs import TariffStore, TariffTables, DEFAULT_TARIFFS_PATH
+
+EUR_RATE = 94.04
+
+AGES = range(0, 9)
+VOLUMES = [600, 999, 1_000, 1_001, 1_499, 1_500, 1_799, 1_800, 1_999, 2_000, 2_299, 2_300, 2_999, 3_000, 3_499, 3_500, 6_000]
+PRICES = [
+    100_000, 199_999, 200_000, 200_001, 449_999, 450_000, 450_001, 1_200_000, 1_200_001, 2_700_000, 2_700_001,
+    4_200_000, 4_200_001, 5_500_000, 5_500_001, 7_000_000, 7_000_001, 20_000_000,
+    # Границы стоимости в евро для пошлины на новые авто
+    *(int(bound * EUR_RATE) + delta for bound in (8_500, 16_700, 42_300, 84_500, 169_000) for delta in (-1, 0, 1))
+]
+
+
+@pytest.fixture(scope='module')
+def tables() -> TariffTables:
+    with open(DEFAULT_TARIFFS_PATH, encoding='utf-8') as file:
+        return TariffTables(json.load(file))
+
+
+def assert_same(tables: TariffTables, age: int, volume: int, price: int, is_electro: bool, is_almost_old: bool) -> None:
+    # Проходная ставка 3-5 лет в calc_* функциях бота - это возраст на год больше
+    table_age = age + is_almost_old
+
+    assert tables.recycling_fee(table_age, volume, is_electro) == tariff_ladders.calc_recycling_fee(age, volume, is_electro, is_almost_old)
+    assert tables.custom_duty(table_age, price, volume, EUR_RATE) == tariff_ladders.calc_custom_duty(age, price, volume, is_almost_old, EUR_RATE)
+    assert tables.custom_clearance(price) == tariff_ladders.calc_custom_clearance(price)
+
+
+def test_table_matches_ladders_on_boundaries(tables):
+    for age, volume, price, is_electro, is_almost_old in product(AGES, VOLUMES, PRICES, (False, True), (False, True)):
+        assert_same(tables, age, volume, price, is_electro, is_almost_old)
+
+
+def test_table_matches_ladders_on_random_cars(tables):
+    rng = random.Random(2025)
+
+    for _ in range(50_000):
+        assert_same(
+            tables,
+            rng.randint(0, 12),
+            rng.randint(500, 7_000),
+            rng.randint(50_000, 30_000_000),
+            rng.random() < 0.1,
+            rng.random() < 0.3
+        )
+
+
+def test_invalid_table_is_rejected(tables):
+    with open(DEFAULT_TARIFFS_PATH, encoding='utf-8') as file:
+        raw = json.load(file)
+
+    raw['custom_clearance']['fees'].pop()
+
+    with pytest.raises(ValueError):
+        TariffTables(raw)
+
+
+def test_reload_keeps_previous_version_on_broken_file(tmp_path):
+    path = tmp_path / 'tariffs.json'
+    path.write_text(DEFAULT_TARIFFS_PATH.read_text(encoding='utf-8'), encoding='utf-8')
+
+    store = TariffStore(path)
+    version = store.tables.version
+
+    path.write_text('{"version": "broken"}', encoding='utf-8')
+    store.mtime = None
+
+    assert store.reload_if_changed() is False
+    assert store.tables.version == version
+